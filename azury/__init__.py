@@ -23,6 +23,8 @@ import logging
 from collections import namedtuple
 
 import azury.asynczury as asynczury
+from azury.exporter import *
+from azury.search import *
 from azury.types import *
 from azury.utils import *
 
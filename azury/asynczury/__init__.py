@@ -22,8 +22,17 @@ __version__ = '0.0.1a'
 import logging
 from collections import namedtuple
 
+from .cache import *
 from .client import *
+from .deadlines import *
+from .exporter import *
+from .fake import *
+from .pipeline import *
+from .scheduler import *
 from .services import *
+from .snapshot import *
+from .transport import *
+from .watchdog import *
 
 VersionInfo = namedtuple(
     'VersionInfo',
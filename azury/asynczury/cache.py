@@ -0,0 +1,267 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use cache.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Tuple, Union
+
+__all__: list[str] = ['SharedCache']
+logger: logging.Logger = logging.getLogger(__name__)
+
+ENDPOINTS: tuple[str, ...] = ('users/data', 'users/teams', 'users/files')
+SCHEMA: tuple[str, ...] = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'CREATE TABLE IF NOT EXISTS responses '
+    '(key TEXT PRIMARY KEY, body TEXT NOT NULL, stored REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS leases '
+    '(key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)',
+)
+
+
+class SharedCache:
+    """A response cache shared by the processes of one host.
+
+    The `SharedCache` stores the response bodies of the user, teams and
+    files endpoints in a SQLite database in WAL mode, so readers never
+    wait for the writer. When an entry is older than `ttl`, a single
+    process takes a lease on it and refreshes it, while the other
+    processes keep serving the stale body or, without one, wait for the
+    refreshed entry. The API traffic therefore does not grow with the
+    number of worker processes.
+
+    The database is only accessed from worker threads, so a busy database
+    never blocks the event loop. Every thread opens its own connection
+    lazily and reopens it after a fork, so a `SharedCache` can be created
+    before the workers are spawned. When the database stays locked for
+    longer than `busy`, the response is requested from the api without
+    the cache.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        The path of the SQLite database.
+    ttl: float
+        The seconds an entry is served without a refresh.
+        Defaults to ``30.0``.
+    lease: float
+        The seconds a process may take to refresh an entry before another
+        process takes over. Defaults to ``10.0``.
+    poll: float
+        The seconds between two reads while waiting for another process.
+        Defaults to ``0.05``.
+    busy: float
+        The seconds a statement waits for a locked database.
+        Defaults to ``0.2``.
+    endpoints: tuple[str, ...]
+        The cached endpoints. Defaults to ``users/data``, ``users/teams``
+        and ``users/files``.
+
+    Examples
+    --------
+    >>> cache = SharedCache('/run/azury/cache.sqlite3')
+    >>> async def handler() -> None:
+    ...     async with Client(token, cache=cache) as client:
+    ...         await (await client.user()).files()
+    """
+
+    def __init__(
+            self,
+            path: Union[str, Path],
+            *,
+            ttl: float = 30.0,
+            lease: float = 10.0,
+            poll: float = 0.05,
+            busy: float = 0.2,
+            endpoints: tuple[str, ...] = ENDPOINTS,
+    ) -> None:
+        self.path: Path = Path(path)
+        self.ttl: float = ttl
+        self.lease: float = lease
+        self.poll: float = poll
+        self.busy: float = busy
+        self.endpoints: tuple[str, ...] = endpoints
+        self.owner: str = uuid.uuid4().hex
+        self._local: threading.local = threading.local()
+        # Connections inherited from a parent process must not be closed,
+        # so all connections stay referenced here.
+        self._connections: list[tuple[int, sqlite3.Connection]] = []
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The :class:`sqlite3.Connection` of the current thread."""
+        local: threading.local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.connection = sqlite3.connect(
+                self.path,
+                timeout=self.busy,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            local.pid = os.getpid()
+            self._connections.append((local.pid, local.connection))
+            for statement in SCHEMA:
+                local.connection.execute(statement)
+        return local.connection
+
+    def close(self) -> None:
+        """Close the connections of the current process."""
+        pid: int = os.getpid()
+        for owner, connection in self._connections:
+            if owner == pid:
+                connection.close()
+        self._connections = [
+            (owner, connection) for owner, connection in self._connections
+            if owner != pid
+        ]
+        self._local = threading.local()
+
+    @staticmethod
+    def key(token: str, endpoint: str) -> str:
+        """Get the cache key of an endpoint of a token."""
+        return f'{hashlib.sha256(token.encode()).hexdigest()}:{endpoint}'
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Get a cached response body and its age in seconds."""
+        row: Optional[Tuple[str, float]] = self.connection.execute(
+            'SELECT body, stored FROM responses WHERE key = ?',
+            (key,),
+        ).fetchone()
+        return None if row is None else (row[0], time.time() - row[1])
+
+    def acquire(self, key: str) -> bool:
+        """Try to take the lease to refresh an entry."""
+        now: float = time.time()
+        cursor: sqlite3.Cursor = self.connection.execute(
+            'INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE '
+            'SET owner = excluded.owner, expires = excluded.expires '
+            'WHERE leases.expires < ?',
+            (key, self.owner, now + self.lease, now),
+        )
+        return cursor.rowcount == 1
+
+    def claim(self, key: str) -> Tuple[Optional[Tuple[str, float]], bool]:
+        """Get an entry and, unless it is fresh, try to take its lease.
+
+        Both happen in one transaction, so a refresh stored in between
+        cannot be missed.
+        """
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE')
+            entry: Optional[Tuple[str, float]] = self.get(key)
+            if entry is not None and entry[1] <= self.ttl:
+                return entry, False
+            return entry, self.acquire(key)
+
+    def release(self, key: str) -> None:
+        """Give up the lease of an entry."""
+        self.connection.execute(
+            'DELETE FROM leases WHERE key = ? AND owner = ?',
+            (key, self.owner),
+        )
+
+    def put(self, key: str, body: str) -> None:
+        """Store a response body and give up the lease of the entry."""
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE')
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                (key, body, time.time()),
+            )
+            self.release(key)
+
+    def invalidate(self, token: str) -> None:
+        """Drop all cached responses of a token."""
+        self.connection.execute(
+            'DELETE FROM responses WHERE key LIKE ?',
+            (f'{self.key(token, "")}%',),
+        )
+
+    async def _quietly(self, function: Callable[..., Any], *args: Any):
+        try:
+            await asyncio.to_thread(function, *args)
+        except sqlite3.Error as error:
+            name: str = function.__name__
+            logger.warning(f'Shared cache {name} failed: {error!r}')
+
+    async def _refresh(
+            self,
+            key: str,
+            fetch: Callable[[], Awaitable[str]],
+    ) -> str:
+        try:
+            body: str = await fetch()
+        except BaseException:
+            await self._quietly(self.release, key)
+            raise
+        await self._quietly(self.put, key, body)
+        return body
+
+    async def _lookup(
+            self,
+            key: str,
+            endpoint: str,
+            fetch: Callable[[], Awaitable[str]],
+    ) -> str:
+        while True:
+            entry: Optional[Tuple[str, float]] = \
+                await asyncio.to_thread(self.get, key)
+            if entry is not None and entry[1] <= self.ttl:
+                return entry[0]
+            acquired: bool
+            entry, acquired = await asyncio.to_thread(self.claim, key)
+            if acquired:
+                logger.info(f'Refreshing shared {endpoint} response')
+                return await self._refresh(key, fetch)
+            if entry is not None:
+                return entry[0]
+            await asyncio.sleep(self.poll)
+
+    async def fetch(
+            self,
+            token: str,
+            endpoint: str,
+            fetch: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Get a response body from the cache or refresh it.
+
+        Parameters
+        ----------
+        token: str
+            The token the response belongs to.
+        endpoint: str
+            The endpoint of the response, e.g. ``'users/data'``.
+        fetch: Callable[[], Awaitable[str]]
+            The function requesting the response body from the api.
+
+        Returns
+        -------
+        str
+            The response body.
+        """
+        try:
+            key: str = self.key(token, endpoint)
+            return await self._lookup(key, endpoint, fetch)
+        except sqlite3.Error as error:
+            logger.warning(f'Shared cache unavailable: {error!r}')
+            return await fetch()
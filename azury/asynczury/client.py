@@ -15,9 +15,13 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import sqlite3
+from contextlib import nullcontext
+from functools import partial
 from types import TracebackType
-from typing import Any, Optional, Type, Union
+from typing import Any, Callable, ContextManager, Optional, Type, Union
 
 import aiohttp
 import sys
@@ -25,6 +29,12 @@ from yarl import URL
 
 import azury.asynczury as asynczury
 import azury.asynczury.utils as utils
+from .cache import SharedCache
+from .deadlines import limit, no_deadline
+from .scheduler import Priority, Scheduler, priority
+from .snapshot import Snapshot
+from .transport import AiohttpTransport, Transport
+from .watchdog import Watchdog
 
 __all__: list[str] = ["Client"]
 
@@ -35,7 +45,9 @@ class Client:
     """The representation of the asyncio azury :class:`Client`.
 
     The :class:`Client` handles the :class:`aiohttp.ClientSession` creation
-    and provides the required request methods for `asynczury`.
+    and provides the required request methods for `asynczury`. The requests
+    are sent by a :class:`Transport`, which defaults to an
+    :class:`AiohttpTransport` using the `session`.
 
     The :class:`Client` also provides an asynchronous context manager.
 
@@ -52,6 +64,31 @@ class Client:
     loop: Optional[:class:`asyncio.AbstractEventLoop`]
         The :class:`asyncio.AbstractEventLoop` to use for asynchronous
         operations. Defaults to ``None``.
+    transport: Optional[:class:`Transport`]
+        The :class:`Transport` used to send requests, e.g. a
+        :class:`FakeTransport` for offline testing. If given, no
+        :class:`aiohttp.ClientSession` is created. Defaults to ``None``.
+    watchdog: Optional[:class:`Watchdog`]
+        The :class:`Watchdog` measuring the blocking time of the requests,
+        JSON decoding and conversions. Defaults to ``None``.
+    scheduler: Optional[:class:`Scheduler`]
+        The :class:`Scheduler` admitting requests by :class:`Priority`
+        with an adaptive concurrency limit. If given without `connector`,
+        the connector is only limited by :attr:`Scheduler.maximum`.
+        Defaults to ``None``.
+    timeout: Optional[float]
+        The longest time of a single request in seconds, not counting
+        the time it waits for the `scheduler`. Requests made
+        within a :func:`deadline` are limited to its remaining budget as
+        well. Defaults to ``None``.
+    snapshot: Optional[:class:`Snapshot`]
+        The :class:`Snapshot` serving the first user, teams and files
+        requests from disk while they are refreshed in the background.
+        Other requests drop the snapshot of the token. Defaults to ``None``.
+    cache: Optional[:class:`SharedCache`]
+        The :class:`SharedCache` sharing the user, teams and files
+        responses between the processes of a host. Other requests drop
+        the cached responses of the token. Defaults to ``None``.
 
     Attributes
     ----------
@@ -59,8 +96,11 @@ class Client:
         The base url for api requests.
     token: :class:`str`
         The personal access token obtained from azury.gg.
-    session: :class:`aiohttp.ClientSession`
-        The :class:`aiohttp.ClientSession` used by the :class:`Client`.
+    session: Optional[:class:`aiohttp.ClientSession`]
+        The :class:`aiohttp.ClientSession` used by the :class:`Client`, if
+        no custom `transport` was given.
+    transport: :class:`Transport`
+        The :class:`Transport` used by the :class:`Client`.
 
     Examples
     --------
@@ -78,11 +118,19 @@ class Client:
             connector: Optional[aiohttp.BaseConnector] = None,
             session: Optional[aiohttp.ClientSession] = None,
             loop: Optional[asyncio.AbstractEventLoop] = None,
+            transport: Optional[Transport] = None,
+            watchdog: Optional[Watchdog] = None,
+            scheduler: Optional[Scheduler] = None,
+            timeout: Optional[float] = None,
+            snapshot: Optional[Snapshot] = None,
+            cache: Optional[SharedCache] = None,
     ) -> None:
         self.base: str = 'https://azury.gg/api'
         self.token: str = token
 
-        if session is None:
+        if transport is None and session is None:
+            if scheduler is not None and connector is None:
+                connector = aiohttp.TCPConnector(limit=scheduler.maximum)
             session: aiohttp.ClientSession = aiohttp.ClientSession(
                 connector=connector,
                 loop=loop,
@@ -94,8 +142,19 @@ class Client:
                                   f'aiohttp{aiohttp.__version__[:5]}',
                 }
             )
-        self.session: aiohttp.ClientSession = session
-        logger.info(f'Created Session {id(self.session)}')
+        if transport is None:
+            transport: Transport = AiohttpTransport(session)
+            logger.info(f'Created Session {id(session)}')
+        self.session: Optional[aiohttp.ClientSession] = session
+        self.transport: Transport = transport
+        self.watchdog: Optional[Watchdog] = watchdog
+        self.scheduler: Optional[Scheduler] = scheduler
+        self.timeout: Optional[float] = timeout
+        self.snapshot: Optional[Snapshot] = snapshot
+        self.cache: Optional[SharedCache] = cache
+        self._warmed: set[str] = set()
+        self._generation: int = 0
+        self._refreshing: set[asyncio.Task] = set()
 
     async def __aenter__(self) -> Client:
         return self
@@ -109,9 +168,9 @@ class Client:
         await self.close()
 
     async def close(self) -> None:
-        r"""Close the current :class:`aiohttp.ClientSession`"""
-        await self.session.close()
-        logger.info(f'Closed Session {id(self.session)}')
+        r"""Close the current :class:`Transport`"""
+        await asyncio.gather(*self._refreshing, return_exceptions=True)
+        await self.transport.close()
 
     async def _request(
             self,
@@ -120,15 +179,144 @@ class Client:
             endpoint: list[str],
             **params: Any,
     ) -> Union[dict, list]:
-        url: URL = URL('/'.join([self.base, service, *endpoint]))
+        path: str = '/'.join([service, *endpoint])
+        url: URL = URL('/'.join([self.base, path]))
         params: dict = dict(**params, token=self.token)
 
-        response: aiohttp.ClientResponse = await self.session.request(
-            method,
-            url,
-            params=params,
+        if method == 'GET' and self._snapshotted(path):
+            body: str = await self._warm(url, path, params)
+        else:
+            body: str = await self._fetch(method, url, path, params)
+        if method != 'GET':
+            await self._invalidate()
+        with self._phase('decode', path, len(body)):
+            return json.loads(body)
+
+    async def _invalidate(self) -> None:
+        self._generation += 1
+        if self.snapshot is not None:
+            await self._drop(self.snapshot.invalidate, OSError, 'snapshot')
+        if self.cache is not None:
+            await self._drop(self.cache.invalidate, sqlite3.Error, 'cache')
+
+    async def _drop(
+            self,
+            invalidate: Callable[[str], None],
+            errors: Type[Exception],
+            name: str,
+    ) -> None:
+        try:
+            await asyncio.to_thread(invalidate, self.token)
+        except errors as error:
+            logger.warning(f'Could not invalidate {name}: {error!r}')
+
+    def _snapshotted(self, path: str) -> bool:
+        return self.snapshot is not None and \
+            path in self.snapshot.endpoints and \
+            path not in self._warmed
+
+    async def _warm(self, url: URL, path: str, params: dict) -> str:
+        self._warmed.add(path)
+        body: Optional[str] = await asyncio.to_thread(
+            self.snapshot.get,
+            self.token,
+            path,
         )
-        return await response.json()
+        if body is None:
+            return await self._refresh(url, path, params)
+        logger.info(f'Serving {path} from snapshot')
+        task: asyncio.Task = asyncio.get_running_loop().create_task(
+            self._background(url, path, params),
+        )
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+        return body
+
+    async def _refresh(self, url: URL, path: str, params: dict) -> str:
+        generation: int = self._generation
+        body: str = await self._fetch('GET', url, path, params)
+        if generation != self._generation:
+            # The data changed while the response was on its way.
+            return body
+        try:
+            await asyncio.to_thread(self.snapshot.put, self.token, path, body)
+        except OSError as error:
+            logger.warning(f'Could not write {path} snapshot: {error!r}')
+        return body
+
+    async def _background(self, url: URL, path: str, params: dict) -> None:
+        try:
+            with no_deadline(), priority(Priority.BULK):
+                await self._refresh(url, path, params)
+        except Exception as error:
+            logger.warning(f'Could not refresh {path} snapshot: {error!r}')
+
+    async def _fetch(
+            self,
+            method: str,
+            url: URL,
+            path: str,
+            params: dict,
+    ) -> str:
+        if method != 'GET' or self.cache is None or \
+                path not in self.cache.endpoints:
+            return await self._attempt(method, url, path, params)
+        return await limit(self.cache.fetch(
+            self.token,
+            path,
+            partial(self._attempt, method, url, path, params),
+        ))
+
+    async def _attempt(
+            self,
+            method: str,
+            url: URL,
+            path: str,
+            params: dict,
+    ) -> str:
+        # The queue wait is only bounded by the deadline, the timeout is
+        # applied inside the slot so the scheduler sees it as an error.
+        return await limit(self._admit(method, url, path, params))
+
+    async def _admit(
+            self,
+            method: str,
+            url: URL,
+            path: str,
+            params: dict,
+    ) -> str:
+        if self.scheduler is None:
+            return await limit(
+                self._send(method, url, path, params),
+                self.timeout,
+            )
+        async with self.scheduler.slot():
+            return await limit(
+                self._send(method, url, path, params),
+                self.timeout,
+            )
+
+    async def _send(
+            self,
+            method: str,
+            url: URL,
+            path: str,
+            params: dict,
+    ) -> str:
+        request = self.transport.request(method, url, params)
+        if self.watchdog is None:
+            return await request
+        return await self.watchdog.measure('request', path, request)
+
+    def _phase(
+            self,
+            phase: str,
+            endpoint: str,
+            size: int,
+    ) -> ContextManager[None]:
+        if self.watchdog is None:
+            return nullcontext()
+        return self.watchdog.phase(phase, endpoint, size)
 
     async def _get(
             self,
@@ -170,4 +358,5 @@ class Client:
     async def user(self) -> asynczury.User:
         data = await self._get('users', ['data'])
         logger.info('Created User instance')
-        return await utils.to_user(self, data['user'])
+        with self._phase('to_user', 'users/data', 1):
+            return await utils.to_user(self, data['user'])
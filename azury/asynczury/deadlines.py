@@ -0,0 +1,191 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use deadlines.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import Any, Awaitable, Iterator, Optional
+
+__all__: list[str] = [
+    'DeadlineExceeded',
+    'deadline',
+    'no_deadline',
+    'remaining',
+    'limit',
+    'fan_out',
+]
+logger: logging.Logger = logging.getLogger(__name__)
+
+_deadline: ContextVar[Optional[float]] = ContextVar(
+    'azury_deadline',
+    default=None,
+)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The error raised when the budget of a :func:`deadline` is spent."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """A context manager to limit the time of all requests made in the
+    current context.
+
+    Nested deadlines can only shorten the budget of the enclosing one. The
+    deadline is inherited by tasks created inside the context.
+
+    Parameters
+    ----------
+    seconds: float
+        The budget in seconds.
+
+    Examples
+    --------
+    >>> async def main(user: User) -> None:
+    ...     with deadline(2.0):
+    ...         files = await user.files()
+    ...         await fan_out(*(file.link() for file in files))
+    """
+    end: float = monotonic() + seconds
+    current: Optional[float] = _deadline.get()
+    token = _deadline.set(end if current is None else min(end, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """A context manager to lift the :func:`deadline` of the current
+    context.
+
+    Work that outlives the request it was started from, like a background
+    refresh, should not inherit the budget of that request.
+
+    Examples
+    --------
+    >>> async def refresh(user: User) -> None:
+    ...     with no_deadline():
+    ...         await user.files()
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """A function to get the remaining budget of the current context.
+
+    Returns
+    -------
+    Optional[float]
+        The remaining seconds, or ``None`` without a :func:`deadline`.
+    """
+    end: Optional[float] = _deadline.get()
+    return None if end is None else end - monotonic()
+
+
+async def limit(aw: Awaitable, timeout: Optional[float] = None) -> Any:
+    """A function to await an attempt within the remaining budget.
+
+    The attempt is cancelled after the smaller of `timeout` and the
+    remaining budget of the current :func:`deadline`.
+
+    Parameters
+    ----------
+    aw: Awaitable
+        The attempt to await.
+    timeout: Optional[float]
+        The longest time of the attempt. Defaults to ``None``.
+
+    Returns
+    -------
+    Any
+        The result of the attempt.
+    """
+    budget: Optional[float] = remaining()
+    if budget is not None and budget <= 0:
+        _close(aw)
+        raise DeadlineExceeded('The deadline has already passed')
+    timeouts: list[float] = [t for t in (budget, timeout) if t is not None]
+    if not timeouts:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, min(timeouts))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f'Timed out after {min(timeouts):.3f}s')
+
+
+def _close(aw: Awaitable) -> None:
+    if asyncio.iscoroutine(aw):
+        aw.close()
+
+
+async def fan_out(*aws: Awaitable) -> list[Any]:
+    """A function to run awaitables concurrently within the budget.
+
+    Unlike :func:`asyncio.gather`, the outstanding awaitables are
+    cancelled as soon as one of them fails or the :func:`deadline` of the
+    current context passes.
+
+    Parameters
+    ----------
+    *aws: Awaitable
+        The awaitables to run.
+
+    Returns
+    -------
+    list[Any]
+        The results in the order of the `aws`.
+    """
+    tasks: list[asyncio.Future] = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return []
+    try:
+        _, pending = await asyncio.wait(
+            tasks,
+            timeout=remaining(),
+            return_when=asyncio.FIRST_EXCEPTION,
+        )
+    finally:
+        await _cancel(tasks)
+    errors: list[BaseException] = _errors(tasks)
+    if errors:
+        raise errors[0]
+    if pending:
+        raise DeadlineExceeded(f'{len(pending)} requests did not finish')
+    return [task.result() for task in tasks]
+
+
+def _errors(tasks: list[asyncio.Future]) -> list[BaseException]:
+    return [
+        task.exception() for task in tasks
+        if not task.cancelled() and task.exception() is not None
+    ]
+
+
+async def _cancel(tasks: list[asyncio.Future]) -> None:
+    pending: list[asyncio.Future] = [task for task in tasks if not task.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.info(f'Cancelled {len(pending)} outstanding requests')
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,111 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use exporter.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
+
+import azury.asynczury as asynczury
+from azury.exporter import Writer, columns, writer_type
+
+__all__: list[str] = ['export']
+logger: logging.Logger = logging.getLogger(__name__)
+
+Record = Union['asynczury.File', 'asynczury.Team']
+
+
+async def _aiter(
+        records: Union[AsyncIterable[Record], Iterable[Record]],
+) -> AsyncIterator[Record]:
+    if isinstance(records, AsyncIterable):
+        async for record in records:
+            yield record
+    else:
+        for record in records:
+            yield record
+
+
+async def _batches(
+        records: Union[AsyncIterable[Record], Iterable[Record]],
+        size: int,
+) -> AsyncIterator[list[Record]]:
+    batch: list[Record] = []
+    async for record in _aiter(records):
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def export(
+        records: Union[AsyncIterable[Record], Iterable[Record]],
+        path: Union[str, Path],
+        format: Optional[str] = None,
+        *,
+        batch_size: int = 1000,
+) -> int:
+    """A function to stream :class:`asynczury.File` or
+    :class:`asynczury.Team` records to a JSONL, CSV or Parquet file.
+
+    The records are consumed as they arrive and written in batches of
+    `batch_size` in a worker thread, so writing does not block the event
+    loop and at most one batch of records is held at a time. This only
+    bounds the records themselves: :meth:`asynczury.User.iter_files`
+    still loads the whole response of the files endpoint into memory.
+
+    Parameters
+    ----------
+    records: Union[AsyncIterable[Record], Iterable[Record]]
+        The records to export, e.g. :meth:`asynczury.User.iter_files`.
+    path: Union[str, Path]
+        The path of the output file.
+    format: Optional[str]
+        One of ``'jsonl'``, ``'csv'`` or ``'parquet'``. Defaults to the
+        suffix of the `path`.
+    batch_size: int
+        The number of records written at once. Defaults to ``1000``.
+
+    Returns
+    -------
+    int
+        The number of exported records.
+
+    Examples
+    --------
+    >>> async def main() -> None:
+    ...     async with asynczury.Client(token) as client:
+    ...         user = await client.user()
+    ...         await asynczury.export(user.iter_files(), 'files.parquet')
+    """
+    factory: type[Writer] = writer_type(path, format)
+    output: Optional[Writer] = None
+    count: int = 0
+    try:
+        async for batch in _batches(records, batch_size):
+            if output is None:
+                output = await asyncio.to_thread(
+                    factory, path, columns(batch[0]),
+                )
+            await asyncio.to_thread(output.write, batch)
+            count += len(batch)
+    finally:
+        if output is not None:
+            await asyncio.to_thread(output.close)
+    logger.info(f'Exported {count} records to {path}')
+    return count
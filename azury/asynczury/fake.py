@@ -0,0 +1,318 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use fake.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from yarl import URL
+
+from .transport import Transport, TransportError
+
+__all__: list[str] = ['FakeAzury', 'FakeTransport']
+logger: logging.Logger = logging.getLogger(__name__)
+
+Response = Tuple[int, Any]
+
+TYPES: tuple[str, ...] = (
+    'image/png',
+    'image/jpeg',
+    'video/mp4',
+    'application/pdf',
+    'text/plain',
+)
+FLAGS: tuple[str, ...] = ('archived', 'trashed', 'favorite')
+
+
+def _timestamp(time: datetime) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%S.') + \
+        f'{time.microsecond // 1000:03d}Z'
+
+
+class FakeAzury:
+    """An in-process stand-in for the azury api.
+
+    The `FakeAzury` generates a deterministic user with personal and team
+    files and implements the endpoints used by `asynczury`. Mutating
+    endpoints like ``clone`` and ``delete`` change the generated state.
+
+    Parameters
+    ----------
+    token: str
+        The token accepted by the `FakeAzury`. Defaults to ``'TOKEN'``.
+    files: int
+        The number of personal files. Defaults to ``100``.
+    teams: int
+        The number of teams. Defaults to ``3``.
+    team_files: int
+        The number of files of every team. Defaults to ``10``.
+    seed: int
+        The seed of the generated data. Defaults to ``0``.
+    """
+
+    def __init__(
+            self,
+            token: str = 'TOKEN',
+            *,
+            files: int = 100,
+            teams: int = 3,
+            team_files: int = 10,
+            seed: int = 0,
+    ) -> None:
+        self.token: str = token
+        self.random: random.Random = random.Random(seed)
+        self.now: datetime = datetime(2021, 6, 1, tzinfo=timezone.utc)
+        self.user: Dict[str, Any] = self._user()
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.teams: Dict[str, Dict[str, Any]] = {}
+        self.team_files: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for _ in range(files):
+            self._add_file()
+        for _ in range(teams):
+            team: Dict[str, Any] = self._team()
+            self.teams[team['_id']] = team
+            self.team_files[team['_id']] = {}
+            for _ in range(team_files):
+                self._add_team_file(team['_id'])
+
+        self.routes: list[Tuple[str, re.Pattern, Callable[..., Response]]] = [
+            ('GET', re.compile(r'users/data'), self.get_user),
+            ('GET', re.compile(r'users/files'), self.get_files),
+            ('GET', re.compile(r'users/teams'), self.get_teams),
+            ('DELETE', re.compile(r'users/delete'), self.delete_user),
+            ('GET', re.compile(r'(users)/files/(\w+)'), self.get_file),
+            ('PUT', re.compile(r'(users)/files/(\w+)/clone'), self.clone),
+            ('DELETE', re.compile(r'(users)/files/(\w+)/delete'), self.delete),
+            ('GET', re.compile(r'teams/(\w+)/files/(\w+)'), self.get_file),
+            ('PUT', re.compile(r'teams/(\w+)/files/(\w+)/clone'), self.clone),
+            ('DELETE', re.compile(r'teams/(\w+)/files/(\w+)/delete'),
+             self.delete),
+            ('PUT', re.compile(r'teams/(\w+)/transfer/(@?\w+)'),
+             self.transfer),
+            ('PUT', re.compile(r'teams/(\w+)/leave'), self.leave),
+        ]
+
+    def _id(self) -> str:
+        return f'{self.random.getrandbits(96):024x}'
+
+    def _snowflake(self) -> str:
+        return str(self.random.randrange(10 ** 17, 10 ** 18))
+
+    def _time(self) -> str:
+        return _timestamp(
+            self.now - timedelta(seconds=self.random.randrange(10 ** 7)),
+        )
+
+    def _user(self) -> Dict[str, Any]:
+        return {
+            '_id': self._snowflake(),
+            'avatar': 'https://cdn.discordapp.com/avatars/0/0.png',
+            'flags': [],
+            'connections': [],
+            'access': [],
+            'ip': self._id(),
+            'token': self.token,
+            'username': 'fake',
+            'createdAt': self._time(),
+            'updatedAt': self._time(),
+        }
+
+    def _team(self) -> Dict[str, Any]:
+        return {
+            '_id': self._id(),
+            'members': [self.user['_id'], self._snowflake()],
+            'icon': '',
+            'flags': [],
+            'name': f'team-{len(self.teams)}',
+            'owner': self.user['_id'],
+            'createdAt': self._time(),
+            'updatedAt': self._time(),
+        }
+
+    def _file(self) -> Dict[str, Any]:
+        return {
+            'flags': [flag for flag in FLAGS if self.random.random() < 0.1],
+            'name': f'file-{self.random.randrange(10 ** 6)}',
+            'size': str(self.random.randrange(1, 1 << 24)),
+            'type': self.random.choice(TYPES),
+            'downloads': self.random.randrange(100),
+            'views': self.random.randrange(1000),
+            'updatedAt': self._time(),
+        }
+
+    def _add_file(self) -> Dict[str, Any]:
+        file: Dict[str, Any] = dict(
+            self._file(),
+            _id=self._id(),
+            user=self.user['_id'],
+            createdAt=self._time(),
+        )
+        self.files[file['_id']] = file
+        return file
+
+    def _add_team_file(self, team: str) -> Dict[str, Any]:
+        file: Dict[str, Any] = dict(
+            self._file(),
+            id=self._id(),
+            author=self.user['_id'],
+            uploadedAt=self._time(),
+        )
+        self.team_files[team][file['id']] = file
+        return file
+
+    def _storage(self, service: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        return self.files if service == 'users' else \
+            self.team_files.get(service)
+
+    def _url(self, file: Dict[str, Any]) -> str:
+        return f'https://azury.gg/s/{file.get("_id") or file["id"]}'
+
+    def get_user(self) -> Response:
+        return 200, {'user': self.user}
+
+    def get_files(self) -> Response:
+        return 200, list(self.files.values())
+
+    def get_teams(self) -> Response:
+        return 200, list(self.teams.values())
+
+    def delete_user(self) -> Response:
+        return 200, {'Success': 'Account deleted'}
+
+    def get_file(self, service: str, id: str) -> Response:
+        file: Optional[Dict[str, Any]] = \
+            (self._storage(service) or {}).get(id)
+        if file is None:
+            return 404, {'error': 'File not found'}
+        return 200, dict(file, url=self._url(file))
+
+    def clone(self, service: str, id: str) -> Response:
+        if id not in (self._storage(service) or {}):
+            return 404, {'error': 'File not found'}
+        file: Dict[str, Any] = self._add_file() if service == 'users' \
+            else self._add_team_file(service)
+        return 200, {'url': self._url(file)}
+
+    def delete(self, service: str, id: str) -> Response:
+        if (self._storage(service) or {}).pop(id, None) is None:
+            return 404, {'error': 'File not found'}
+        return 200, {'Success': 'File deleted'}
+
+    def transfer(self, team: str, user: str) -> Response:
+        if team not in self.teams:
+            return 404, {'error': 'Team not found'}
+        self.teams[team]['owner'] = user.lstrip('@')
+        return 200, self.teams[team]
+
+    def leave(self, team: str) -> Response:
+        if self.teams.pop(team, None) is None:
+            return 404, {'error': 'Team not found'}
+        return 200, {'Success': 'Left team'}
+
+    def handle(
+            self,
+            method: str,
+            path: str,
+            params: Dict[str, Any],
+    ) -> Response:
+        """Handle a request to the fake api.
+
+        Parameters
+        ----------
+        method: str
+            The HTTP method of the request.
+        path: str
+            The url path, with or without the ``/api/`` prefix.
+        params: Dict[str, Any]
+            The query parameters, including the token.
+
+        Returns
+        -------
+        Tuple[int, Any]
+            The HTTP status and the JSON payload of the response.
+        """
+        if params.get('token') != self.token:
+            return 401, {'error': 'Unauthorized'}
+        path: str = path.strip('/')
+        path = path[4:] if path.startswith('api/') else path
+        for route_method, pattern, handler in self.routes:
+            match: Optional[re.Match] = pattern.fullmatch(path)
+            if route_method == method.upper() and match:
+                return handler(*match.groups())
+        return 404, {'error': 'Not found'}
+
+
+class FakeTransport(Transport):
+    """The :class:`Transport` answering requests with a :class:`FakeAzury`.
+
+    Parameters
+    ----------
+    server: Optional[:class:`FakeAzury`]
+        The fake api to use. Defaults to a new :class:`FakeAzury`.
+    latency: float
+        The seconds every request takes. Defaults to ``0.0``.
+    jitter: float
+        The maximum seconds added randomly to the `latency`.
+        Defaults to ``0.0``.
+    error_rate: float
+        The probability of a request failing with a
+        :class:`TransportError`. Defaults to ``0.0``.
+    seed: int
+        The seed of the latency and error injection. Defaults to ``0``.
+
+    Examples
+    --------
+    >>> transport = FakeTransport(latency=0.05, error_rate=0.01)
+    >>> async def main() -> None:
+    ...     async with Client('TOKEN', transport=transport) as client:
+    ...         print(await client.user())
+    """
+
+    def __init__(
+            self,
+            server: Optional[FakeAzury] = None,
+            *,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            seed: int = 0,
+    ) -> None:
+        self.server: FakeAzury = server or FakeAzury()
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rate: float = error_rate
+        self.random: random.Random = random.Random(seed)
+
+    async def request(
+            self,
+            method: str,
+            url: URL,
+            params: Dict[str, Any],
+    ) -> str:
+        delay: float = self.latency + self.jitter * self.random.random()
+        if delay:
+            await asyncio.sleep(delay)
+        if self.random.random() < self.error_rate:
+            raise TransportError(503, 'Injected error')
+        status, payload = self.server.handle(method, url.path, params)
+        logger.debug(f'{method} {url.path} {status}')
+        if status == 429 or status >= 500:
+            raise TransportError(status, json.dumps(payload))
+        return json.dumps(payload)
@@ -0,0 +1,344 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use loadtest.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""An end-to-end load test of :class:`asynczury.Client`.
+
+The load test drives a weighted mix of client operations from a growing
+number of coroutines against a local aiohttp server backed by a
+:class:`FakeAzury`, and reports throughput, latency percentiles and the
+resident memory for every concurrency level, along with the peak number of
+connections in use and the time spent waiting for a free connection::
+
+    python -m azury.asynczury.loadtest --concurrency 10 100 1000
+
+The stand-in server runs on the same event loop as the client, so the
+numbers are meant for comparisons between versions and settings rather
+than as absolute capacity limits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import resource
+import statistics
+from collections import namedtuple
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import azury.asynczury as asynczury
+import azury.asynczury.utils as utils
+from .fake import FakeAzury
+
+__all__: list[str] = ['Result', 'MIX', 'application', 'run', 'main']
+logger: logging.Logger = logging.getLogger(__name__)
+
+Result = namedtuple(
+    'Result',
+    'concurrency requests errors duration throughput '
+    'p50 p95 p99 rss rss_per_task connections limit wait',
+)
+Operation = Callable[['asynczury.User', 'asynczury.File'], Awaitable[Any]]
+
+OPERATIONS: Dict[str, Operation] = {
+    'user': lambda user, file: user.client.user(),
+    'files': lambda user, file: user.files(),
+    'get': lambda user, file: user.get(file),
+    'link': lambda user, file: file.link(),
+    'clone': lambda user, file: file.clone(),
+    'delete': lambda user, file: file.delete(),
+}
+MIX: Dict[str, int] = {
+    'user': 5,
+    'files': 5,
+    'get': 40,
+    'link': 40,
+    'clone': 5,
+    'delete': 5,
+}
+
+
+def _rss() -> int:
+    try:
+        with open('/proc/self/statm') as fp:
+            return int(fp.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def application(server: FakeAzury, latency: float = 0.0) -> web.Application:
+    """A function to create an aiohttp application serving a
+    :class:`FakeAzury` under ``/api``.
+
+    Parameters
+    ----------
+    server: :class:`FakeAzury`
+        The fake api to serve.
+    latency: float
+        The seconds every response is delayed. Defaults to ``0.0``.
+
+    Returns
+    -------
+    :class:`aiohttp.web.Application`
+        The application.
+    """
+    async def handle(request: web.Request) -> web.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        status, payload = server.handle(
+            request.method,
+            request.path,
+            dict(request.query),
+        )
+        return web.json_response(payload, status=status)
+
+    app: web.Application = web.Application()
+    app.router.add_route('*', '/api/{path:.*}', handle)
+    return app
+
+
+class _Pool:
+    def __init__(self) -> None:
+        self.connections: int = 0
+        self.peak: int = 0
+        self.waited: float = 0.0
+        self.trace: aiohttp.TraceConfig = aiohttp.TraceConfig()
+        self.trace.on_connection_queued_start.append(self._queued)
+        self.trace.on_connection_queued_end.append(self._dequeued)
+        self.trace.on_connection_create_end.append(self._acquired)
+        self.trace.on_connection_reuseconn.append(self._acquired)
+        self.trace.on_request_end.append(self._released)
+        self.trace.on_request_exception.append(self._released)
+
+    async def _queued(self, session, context: SimpleNamespace, _) -> None:
+        context.queued = perf_counter()
+
+    async def _dequeued(self, session, context: SimpleNamespace, _) -> None:
+        self.waited += perf_counter() - context.queued
+
+    async def _acquired(self, session, context: SimpleNamespace, _) -> None:
+        context.acquired = True
+        self.connections += 1
+        self.peak = max(self.peak, self.connections)
+
+    async def _released(self, session, context: SimpleNamespace, _) -> None:
+        if getattr(context, 'acquired', False):
+            context.acquired = False
+            self.connections -= 1
+
+
+class _Load:
+    def __init__(
+            self,
+            server: FakeAzury,
+            user: asynczury.User,
+            mix: Dict[str, int],
+            seed: int,
+    ) -> None:
+        self.server: FakeAzury = server
+        self.user: asynczury.User = user
+        self.names: list[str] = list(mix)
+        self.weights: list[int] = list(mix.values())
+        self.random: random.Random = random.Random(seed)
+        self.ids: list[str] = list(server.files)
+        self.latencies: list[float] = []
+        self.errors: int = 0
+        self.peak: int = 0
+
+    def _pick(self) -> Dict[str, Any]:
+        # Deleted files are dropped lazily, clones are picked up whenever
+        # the ids run out.
+        while self.ids:
+            index: int = self.random.randrange(len(self.ids))
+            data: Optional[Dict[str, Any]] = \
+                self.server.files.get(self.ids[index])
+            if data is not None:
+                return data
+            self.ids[index] = self.ids[-1]
+            self.ids.pop()
+        self.ids = list(self.server.files)
+        if not self.ids:
+            raise LookupError('The fake api has no files left')
+        return self._pick()
+
+    async def operation(self) -> None:
+        name: str = self.random.choices(self.names, self.weights)[0]
+        start: float = perf_counter()
+        try:
+            file: asynczury.File = await utils.to_file(
+                self.user.client,
+                self.user.service,
+                self._pick(),
+            )
+            start = perf_counter()
+            await OPERATIONS[name](self.user, file)
+        except Exception as error:
+            self.errors += 1
+            logger.debug(f'{name} failed: {error!r}')
+        self.latencies.append(perf_counter() - start)
+
+    async def worker(self, end: float) -> None:
+        while perf_counter() < end:
+            await self.operation()
+
+    async def sample(self) -> None:
+        while True:
+            self.peak = max(self.peak, _rss())
+            await asyncio.sleep(0.1)
+
+
+def _result(
+        load: _Load,
+        pool: _Pool,
+        concurrency: int,
+        duration: float,
+        baseline: int,
+        limit: int,
+) -> Result:
+    latencies: list[float] = load.latencies or [0.0]
+    quantiles: list[float] = statistics.quantiles(
+        latencies * 2 if len(latencies) < 2 else latencies,
+        n=100,
+    )
+    return Result(
+        concurrency=concurrency,
+        requests=len(load.latencies),
+        errors=load.errors,
+        duration=duration,
+        throughput=len(load.latencies) / duration,
+        p50=quantiles[49],
+        p95=quantiles[94],
+        p99=quantiles[98],
+        rss=load.peak,
+        rss_per_task=max(load.peak - baseline, 0) / concurrency,
+        connections=pool.peak,
+        limit=limit,
+        wait=pool.waited / max(len(load.latencies), 1),
+    )
+
+
+async def run(
+        concurrency: int,
+        duration: float = 10.0,
+        *,
+        files: int = 1000,
+        latency: float = 0.0,
+        limit: int = 100,
+        mix: Optional[Dict[str, int]] = None,
+        seed: int = 0,
+) -> Result:
+    """A function to run one load test level.
+
+    Parameters
+    ----------
+    concurrency: int
+        The number of coroutines issuing operations.
+    duration: float
+        The seconds the operations are issued. Defaults to ``10.0``.
+    files: int
+        The number of files of the fake user. Defaults to ``1000``.
+    latency: float
+        The seconds every response of the server is delayed.
+        Defaults to ``0.0``.
+    limit: int
+        The connection limit of the client connector. Defaults to ``100``.
+    mix: Optional[Dict[str, int]]
+        The weights of the operations. Defaults to :data:`MIX`.
+    seed: int
+        The seed of the fake data and the operation mix.
+        Defaults to ``0``.
+
+    Returns
+    -------
+    :class:`Result`
+        The measurements of the level. `connections` is the peak number
+        of connections in use and `wait` the mean seconds an operation
+        waited for a free connection.
+    """
+    server: FakeAzury = FakeAzury(files=files, seed=seed)
+    pool: _Pool = _Pool()
+    session: aiohttp.ClientSession = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=limit),
+        trace_configs=[pool.trace],
+    )
+    async with TestServer(application(server, latency)) as test_server, \
+            asynczury.Client(server.token, session=session) as client:
+        client.base = str(test_server.make_url('/api'))
+        load: _Load = _Load(server, await client.user(), mix or MIX, seed)
+        baseline: int = _rss()
+        sampler: asyncio.Task = asyncio.ensure_future(load.sample())
+        start: float = perf_counter()
+        await asyncio.gather(
+            *(load.worker(start + duration) for _ in range(concurrency)),
+        )
+        elapsed: float = perf_counter() - start
+        sampler.cancel()
+    return _result(load, pool, concurrency, elapsed, baseline, limit)
+
+
+def _print(result: Result) -> None:
+    print(
+        f'{result.concurrency:>6} {result.requests:>9} {result.errors:>7} '
+        f'{result.throughput:>10.1f} {result.p50 * 1000:>8.2f} '
+        f'{result.p95 * 1000:>8.2f} {result.p99 * 1000:>8.2f} '
+        f'{result.rss / 2 ** 20:>8.1f} {result.rss_per_task / 1024:>10.1f} '
+        f'{f"{result.connections}/{result.limit}":>9} '
+        f'{result.wait * 1000:>8.2f}',
+    )
+
+
+async def _main(arguments: argparse.Namespace) -> None:
+    print(
+        f'{"tasks":>6} {"requests":>9} {"errors":>7} {"req/s":>10} '
+        f'{"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"rss MiB":>8} '
+        f'{"KiB/task":>10} {"conns":>9} {"wait ms":>8}',
+    )
+    for concurrency in arguments.concurrency:
+        _print(await run(
+            concurrency,
+            arguments.duration,
+            files=arguments.files,
+            latency=arguments.latency,
+            limit=arguments.limit,
+            seed=arguments.seed,
+        ))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """The command line entry point of the load test."""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog='python -m azury.asynczury.loadtest',
+        description='Load test asynczury against a local fake azury api.',
+    )
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[10, 100, 1000],
+    )
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use pipeline.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from collections import namedtuple
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Coroutine,
+    Iterable,
+    Optional,
+    Union,
+)
+
+import azury.asynczury as asynczury
+
+__all__: list[str] = ['Pipeline']
+logger: logging.Logger = logging.getLogger(__name__)
+
+Stage = namedtuple('Stage', 'function concurrency filter')
+_Failure = namedtuple('_Failure', 'error')
+_END: object = object()
+
+
+async def _call(function: Callable[[Any], Any], item: Any) -> Any:
+    result: Any = function(item)
+    return await result if inspect.isawaitable(result) else result
+
+
+class Pipeline:
+    """A streaming pipeline of asynchronous stages.
+
+    Every stage runs its own workers and is connected to the next stage by
+    a bounded queue, so a slow stage slows down the previous ones instead
+    of buffering their output. If any stage fails, all stages are
+    cancelled and the error is raised to the consumer. Stages with more
+    than one worker do not preserve the order of the items.
+
+    Parameters
+    ----------
+    source: Union[AsyncIterable, Iterable]
+        The items fed into the first stage.
+    buffer: int
+        The capacity of the queues between the stages. Defaults to ``64``.
+
+    Examples
+    --------
+    >>> async def cleanup(user: User) -> int:
+    ...     return await (
+    ...         Pipeline.files(user)
+    ...         .filter(lambda file: file.trashed)
+    ...         .map(lambda file: file.delete(), concurrency=8)
+    ...         .run()
+    ...     )
+    """
+
+    def __init__(
+            self,
+            source: Union[AsyncIterable, Iterable],
+            *,
+            buffer: int = 64,
+    ) -> None:
+        self.source: Union[AsyncIterable, Iterable] = source
+        self.buffer: int = buffer
+        self.stages: list[Stage] = []
+        self._tasks: list[asyncio.Task] = []
+        self._output: Optional[asyncio.Queue] = None
+
+    @classmethod
+    def files(cls, user: asynczury.User, *, buffer: int = 64) -> Pipeline:
+        """Create a `Pipeline` over the files of a :class:`User`."""
+        return cls(user.iter_files(), buffer=buffer)
+
+    def map(
+            self,
+            function: Callable[[Any], Any],
+            *,
+            concurrency: int = 1,
+    ) -> Pipeline:
+        """Add a stage replacing every item by the result of `function`.
+
+        Parameters
+        ----------
+        function: Callable[[Any], Any]
+            A function or coroutine function applied to every item.
+        concurrency: int
+            The number of workers of the stage. Defaults to ``1``.
+        """
+        self.stages.append(Stage(function, concurrency, False))
+        return self
+
+    def filter(
+            self,
+            predicate: Callable[[Any], Any],
+            *,
+            concurrency: int = 1,
+    ) -> Pipeline:
+        """Add a stage dropping the items for which `predicate` is false.
+
+        Parameters
+        ----------
+        predicate: Callable[[Any], Any]
+            A function or coroutine function applied to every item.
+        concurrency: int
+            The number of workers of the stage. Defaults to ``1``.
+        """
+        self.stages.append(Stage(predicate, concurrency, True))
+        return self
+
+    async def _produce(self, output: asyncio.Queue) -> None:
+        if isinstance(self.source, AsyncIterable):
+            async for item in self.source:
+                await output.put(item)
+        else:
+            for item in self.source:
+                await output.put(item)
+        await output.put(_END)
+
+    async def _work(
+            self,
+            stage: Stage,
+            queue: asyncio.Queue,
+            output: asyncio.Queue,
+    ) -> None:
+        while (item := await queue.get()) is not _END:
+            result: Any = await _call(stage.function, item)
+            if not stage.filter:
+                await output.put(result)
+            elif result:
+                await output.put(item)
+        await queue.put(_END)
+
+    async def _stage(
+            self,
+            stage: Stage,
+            queue: asyncio.Queue,
+            output: asyncio.Queue,
+    ) -> None:
+        workers: list[asyncio.Task] = [
+            asyncio.ensure_future(self._work(stage, queue, output))
+            for _ in range(stage.concurrency)
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # gather does not cancel the other workers when one fails.
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        await output.put(_END)
+
+    async def _supervise(
+            self,
+            function: Callable[..., Coroutine],
+            *args: Any,
+    ) -> None:
+        # The coroutine is created here, so that a supervisor cancelled
+        # before it started does not leave a coroutine never awaited.
+        try:
+            await function(*args)
+        except Exception as error:
+            self._fail(error)
+
+    def _fail(self, error: Exception) -> None:
+        logger.info(f'Pipeline stage failed: {error!r}')
+        for task in self._tasks:
+            task.cancel()
+        while not self._output.empty():
+            self._output.get_nowait()
+        self._output.put_nowait(_Failure(error))
+
+    def _start(self) -> asyncio.Queue:
+        queues: list[asyncio.Queue] = [
+            asyncio.Queue(self.buffer) for _ in range(len(self.stages) + 1)
+        ]
+        self._output = queues[-1]
+        self._tasks = [
+            asyncio.ensure_future(self._supervise(self._produce, queues[0])),
+        ] + [
+            asyncio.ensure_future(
+                self._supervise(self._stage, stage, queue, output),
+            )
+            for stage, queue, output in zip(self.stages, queues, queues[1:])
+        ]
+        return self._output
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        output: asyncio.Queue = self._start()
+        try:
+            while (item := await output.get()) is not _END:
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def collect(self) -> list[Any]:
+        """Run the `Pipeline` and return the items of the last stage."""
+        return [item async for item in self]
+
+    async def run(self) -> int:
+        """Run the `Pipeline` and return the number of items of the last
+        stage."""
+        count: int = 0
+        async for _ in self:
+            count += 1
+        return count
@@ -0,0 +1,222 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use scheduler.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import logging
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import AsyncIterator, Deque, Dict, Iterator, Optional
+
+__all__: list[str] = ['Priority', 'Scheduler', 'priority']
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class Priority(enum.IntEnum):
+    """The priority classes of requests, the lowest value is served first."""
+    INTERACTIVE = 0
+    BULK = 1
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    'azury_priority',
+    default=Priority.INTERACTIVE,
+)
+
+
+@contextmanager
+def priority(value: Priority) -> Iterator[None]:
+    """A context manager to set the :class:`Priority` of the requests made
+    in the current context.
+
+    Parameters
+    ----------
+    value: :class:`Priority`
+        The :class:`Priority` of the requests.
+
+    Examples
+    --------
+    >>> async def cleanup(user: User) -> None:
+    ...     with priority(Priority.BULK):
+    ...         for file in await user.files():
+    ...             await file.delete()
+    """
+    token = _priority.set(value)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _overloaded(error: Exception) -> bool:
+    status: Optional[int] = getattr(error, 'status', None)
+    return status is None or status == 429 or status >= 500
+
+
+class Scheduler:
+    """The admission control of the requests of a :class:`asynczury.Client`.
+
+    Requests wait in one queue per :class:`Priority` and interactive
+    requests are always admitted before bulk requests. Bulk requests
+    additionally leave `reserved` slots free for interactive ones.
+
+    The number of requests in flight is limited by an AIMD controller: the
+    limit grows by one per round of successful requests and is multiplied
+    by `backoff` when a request fails or takes longer than `target`. Errors
+    with an HTTP ``status`` only count as failures for ``429`` and server
+    errors, a missing file does not mean the api is overloaded.
+
+    Parameters
+    ----------
+    initial: int
+        The initial limit of requests in flight. Defaults to ``8``.
+    minimum: int
+        The lowest limit. Defaults to ``1``.
+    maximum: int
+        The highest limit. Defaults to ``256``.
+    target: float
+        The highest latency in seconds considered healthy.
+        Defaults to ``1.0``.
+    backoff: float
+        The factor applied to the limit on congestion. Defaults to ``0.5``.
+    reserved: int
+        The slots bulk requests leave for interactive ones.
+        Defaults to ``1``.
+
+    Attributes
+    ----------
+    limit: float
+        The current limit of requests in flight.
+    in_flight: int
+        The number of admitted requests.
+    """
+
+    def __init__(
+            self,
+            *,
+            initial: int = 8,
+            minimum: int = 1,
+            maximum: int = 256,
+            target: float = 1.0,
+            backoff: float = 0.5,
+            reserved: int = 1,
+    ) -> None:
+        self.limit: float = float(initial)
+        self.minimum: int = minimum
+        self.maximum: int = maximum
+        self.target: float = target
+        self.backoff: float = backoff
+        self.reserved: int = reserved
+        self.in_flight: int = 0
+        self.queues: Dict[Priority, Deque[asyncio.Future]] = {
+            value: deque() for value in Priority
+        }
+        self._decreased: float = 0.0
+
+    def _available(self, value: Priority) -> bool:
+        reserved: int = self.reserved if value is Priority.BULK else 0
+        return self.in_flight < max(int(self.limit) - reserved, 1)
+
+    def _waiting(self, value: Priority) -> bool:
+        return any(self.queues[other] for other in Priority if other <= value)
+
+    def _wake(self) -> None:
+        for value in Priority:
+            queue: Deque[asyncio.Future] = self.queues[value]
+            while queue and self._available(value):
+                future: asyncio.Future = queue.popleft()
+                if not future.done():
+                    self.in_flight += 1
+                    future.set_result(None)
+
+    async def acquire(self, value: Optional[Priority] = None) -> None:
+        """Wait until a request of the given :class:`Priority` is admitted.
+
+        Parameters
+        ----------
+        value: Optional[:class:`Priority`]
+            The :class:`Priority` of the request. Defaults to the
+            :func:`priority` of the current context.
+        """
+        value: Priority = _priority.get() if value is None else value
+        if self._available(value) and not self._waiting(value):
+            self.in_flight += 1
+            return
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queues[value].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._cancel(value, future)
+            raise
+
+    def _cancel(self, value: Priority, future: asyncio.Future) -> None:
+        if future.done() and not future.cancelled():
+            self.in_flight -= 1
+            self._wake()
+        elif future in self.queues[value]:
+            self.queues[value].remove(future)
+
+    def release(self, latency: float, error: bool = False) -> None:
+        """Release an admitted request and adapt the limit.
+
+        Parameters
+        ----------
+        latency: float
+            The seconds the request took.
+        error: bool
+            Whether the request failed. Defaults to ``False``.
+        """
+        self.in_flight -= 1
+        if error or latency > self.target:
+            self._decrease(latency)
+        else:
+            self.limit = min(self.limit + 1 / self.limit, self.maximum)
+        self._wake()
+
+    def _decrease(self, latency: float) -> None:
+        now: float = monotonic()
+        if now - self._decreased < latency:
+            return
+        self._decreased = now
+        self.limit = max(self.limit * self.backoff, self.minimum)
+        logger.info(f'Decreased request limit to {int(self.limit)}')
+
+    @asynccontextmanager
+    async def slot(
+            self,
+            value: Optional[Priority] = None,
+    ) -> AsyncIterator[None]:
+        """An asynchronous context manager admitting a single request.
+
+        Parameters
+        ----------
+        value: Optional[:class:`Priority`]
+            The :class:`Priority` of the request. Defaults to the
+            :func:`priority` of the current context.
+        """
+        await self.acquire(value)
+        start: float = monotonic()
+        error: bool = False
+        try:
+            yield
+        except Exception as exception:
+            error = _overloaded(exception)
+            raise
+        finally:
+            self.release(monotonic() - start, error)
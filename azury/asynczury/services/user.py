@@ -16,7 +16,7 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Dict, Union
+from typing import AsyncIterator, Dict, Union
 
 import azury.asynczury as asynczury
 import azury.asynczury.utils as utils
@@ -95,6 +95,8 @@ class User(UserType):
     -------
     files()
         List all personal files of the `User`.
+    iter_files()
+        Iterate over all personal files of the `User`.
     teams()
         List all teams the `User` is part of.
     get(file: Union[:class:`asynczury.File`, str])
@@ -145,31 +147,47 @@ class User(UserType):
         response: list[Dict[str, Union[str, bool, int, list]]] = \
             await self.client._get(self.service, ['files'])
         logger.info(f'Requested files from user {self.id}')
-        return [
-            await utils.to_file(
-                self.client,
-                self.service,
-                file,
-            ) for file in response
-        ]
+        with self.client._phase('to_file', 'users/files', len(response)):
+            return [
+                await utils.to_file(
+                    self.client,
+                    self.service,
+                    file,
+                ) for file in response
+            ]
+
+    async def iter_files(self) -> AsyncIterator[asynczury.File]:
+        response: list[Dict[str, Union[str, bool, int, list]]] = \
+            await self.client._get(self.service, ['files'])
+        logger.info(f'Requested files from user {self.id}')
+        for file in response:
+            with self.client._phase('to_file', 'users/files', 1):
+                converted: asynczury.File = await utils.to_file(
+                    self.client,
+                    self.service,
+                    file,
+                )
+            yield converted
 
     async def get(self, file: Union[asynczury.File, str]) -> asynczury.File:
         response: Dict[str, str] = await self.client._get(
             self.service,
             ['files', file.id if isinstance(file, asynczury.File) else file],
         )
-        return await utils.to_file(self.client, self.service, response)
+        with self.client._phase('to_file', 'users/files', 1):
+            return await utils.to_file(self.client, self.service, response)
 
     async def teams(self) -> list[asynczury.Team]:
         response: list[Dict[str, Union[str, list, int]]] = \
             await self.client._get(self.service, ['teams'])
         logger.info(f'Requested user {self.id} teams')
-        return [
-            await utils.to_team(
-                self.client,
-                team,
-            ) for team in response
-        ]
+        with self.client._phase('to_team', 'users/teams', len(response)):
+            return [
+                await utils.to_team(
+                    self.client,
+                    team,
+                ) for team in response
+            ]
 
     async def delete(self) -> bool:
         return await self.client._delete(self.service, ['delete'])
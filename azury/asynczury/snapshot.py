@@ -0,0 +1,178 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use snapshot.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+__all__: list[str] = ['Snapshot']
+logger: logging.Logger = logging.getLogger(__name__)
+
+ENDPOINTS: tuple[str, ...] = ('users/data', 'users/teams', 'users/files')
+
+
+def _directory() -> Path:
+    cache: str = os.environ.get('XDG_CACHE_HOME', '~/.cache')
+    return Path(cache).expanduser() / 'azury'
+
+
+def _updated_at(body: str) -> Optional[str]:
+    try:
+        return json.loads(body)['user']['updatedAt']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class Snapshot:
+    """An opt-in on-disk snapshot of the responses needed at startup.
+
+    The `Snapshot` stores the raw responses of the user, teams and files
+    endpoints in one file per token, named after the SHA-256 hash of the
+    token and only readable by the current user. A :class:`Client` using
+    a `Snapshot` serves the first request of every stored endpoint from
+    it and refreshes the entry in the background.
+
+    Entries older than `ttl` are ignored. When the ``updatedAt`` of the
+    user changes, the stored teams and files are dropped as well. Writes
+    from several threads are serialized and every write goes to its own
+    temporary file, so the snapshot file is always complete. A
+    :class:`Client` drops the snapshot of its token after every request
+    changing data, like deleting a file.
+
+    Parameters
+    ----------
+    directory: Optional[Union[str, Path]]
+        The directory of the snapshot files. Defaults to
+        ``$XDG_CACHE_HOME/azury``.
+    ttl: float
+        The seconds an entry may be served. Defaults to ``3600``.
+    endpoints: tuple[str, ...]
+        The endpoints stored in the snapshot. Defaults to ``users/data``,
+        ``users/teams`` and ``users/files``.
+    """
+
+    def __init__(
+            self,
+            directory: Optional[Union[str, Path]] = None,
+            *,
+            ttl: float = 3600.0,
+            endpoints: tuple[str, ...] = ENDPOINTS,
+    ) -> None:
+        self.directory: Path = Path(directory or _directory())
+        self.ttl: float = ttl
+        self.endpoints: tuple[str, ...] = endpoints
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def path(self, token: str) -> Path:
+        """Get the path of the snapshot file of a token."""
+        digest: str = hashlib.sha256(token.encode()).hexdigest()
+        return self.directory / f'{digest}.json'
+
+    def _load(self, token: str) -> Dict[str, Any]:
+        if token not in self._entries:
+            try:
+                with self.path(token).open(encoding='utf-8') as fp:
+                    self._entries[token] = json.load(fp)
+            except (OSError, ValueError):
+                self._entries[token] = {}
+        return self._entries[token]
+
+    def get(self, token: str, endpoint: str) -> Optional[str]:
+        """Get a stored response body if it is younger than the `ttl`.
+
+        Parameters
+        ----------
+        token: str
+            The token the response belongs to.
+        endpoint: str
+            The endpoint of the response, e.g. ``'users/data'``.
+
+        Returns
+        -------
+        Optional[str]
+            The response body or ``None``.
+        """
+        with self._lock:
+            entry: Optional[Dict[str, Any]] = \
+                self._load(token).get(endpoint)
+        if entry is None or time.time() - entry['time'] > self.ttl:
+            return None
+        return entry['body']
+
+    def put(self, token: str, endpoint: str, body: str) -> None:
+        """Store a response body and write the snapshot file.
+
+        Parameters
+        ----------
+        token: str
+            The token the response belongs to.
+        endpoint: str
+            The endpoint of the response, e.g. ``'users/data'``.
+        body: str
+            The response body.
+        """
+        with self._lock:
+            entries: Dict[str, Any] = self._load(token)
+            if endpoint == 'users/data':
+                self._check(entries, _updated_at(body))
+            entries[endpoint] = {'time': time.time(), 'body': body}
+            self._write(token, entries)
+
+    def invalidate(self, token: str) -> None:
+        """Drop the stored responses of a token and its snapshot file.
+
+        Parameters
+        ----------
+        token: str
+            The token whose responses are dropped.
+        """
+        with self._lock:
+            self._entries[token] = {}
+            with contextlib.suppress(FileNotFoundError):
+                self.path(token).unlink()
+
+    def _check(self, entries: Dict[str, Any], updated_at: Optional[str]):
+        stored: Optional[str] = entries.get('updatedAt')
+        if stored is not None and stored != updated_at:
+            logger.info('User was updated, dropping the snapshot')
+            entries.clear()
+        entries['updatedAt'] = updated_at
+
+    def _write(self, token: str, entries: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path: Path = self.path(token)
+        # mkstemp creates the file with mode 0600 and a unique name.
+        fd, temporary = tempfile.mkstemp(
+            prefix=f'{path.stem}.',
+            suffix='.tmp',
+            dir=self.directory,
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                json.dump(entries, fp)
+            os.replace(temporary, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temporary)
+            raise
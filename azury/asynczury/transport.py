@@ -0,0 +1,286 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use transport.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import json
+import logging
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+
+import aiohttp
+from yarl import URL
+
+__all__: list[str] = [
+    'Transport',
+    'TransportError',
+    'AiohttpTransport',
+    'RecordTransport',
+    'ReplayTransport',
+]
+logger: logging.Logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+Response = Tuple[Optional[int], str]
+
+
+class TransportError(aiohttp.ClientError):
+    """The error raised by a :class:`Transport` if a request failed.
+
+    Parameters
+    ----------
+    status: int
+        The HTTP status of the failed request.
+    message: str
+        The reason of the failure.
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        super(TransportError, self).__init__(f'{status}: {message}')
+        self.status: int = status
+        self.message: str = message
+
+
+class Transport(abc.ABC):
+    """The base class of the transports used by :class:`asynczury.Client`.
+
+    A `Transport` sends a single request to the azury api and returns the
+    raw response body. Decoding is left to the :class:`asynczury.Client`.
+    Client errors like a missing file are answered with their error body,
+    only ``429`` and server errors raise a :class:`TransportError`, so the
+    :class:`Scheduler` can back off.
+    """
+
+    @abc.abstractmethod
+    async def request(
+            self,
+            method: str,
+            url: URL,
+            params: Dict[str, Any],
+    ) -> str:
+        """Send a request and return the response body.
+
+        Parameters
+        ----------
+        method: str
+            The HTTP method of the request.
+        url: :class:`yarl.URL`
+            The full url of the endpoint.
+        params: Dict[str, Any]
+            The query parameters, including the token.
+
+        Returns
+        -------
+        str
+            The raw response body, also of client errors.
+
+        Raises
+        ------
+        :class:`TransportError`
+            The api answered with ``429`` or a server error.
+        """
+
+    async def close(self) -> None:
+        """Release the resources held by the `Transport`."""
+
+
+class AiohttpTransport(Transport):
+    """The :class:`Transport` sending requests with aiohttp.
+
+    Parameters
+    ----------
+    session: :class:`aiohttp.ClientSession`
+        The :class:`aiohttp.ClientSession` used for making requests.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        self.session: aiohttp.ClientSession = session
+
+    async def request(
+            self,
+            method: str,
+            url: URL,
+            params: Dict[str, Any],
+    ) -> str:
+        async with self.session.request(
+                method,
+                url,
+                params=params,
+        ) as response:
+            body: str = await response.text()
+        if response.status == 429 or response.status >= 500:
+            raise TransportError(response.status, body or response.reason)
+        return body
+
+    async def close(self) -> None:
+        await self.session.close()
+        logger.info(f'Closed Session {id(self.session)}')
+
+
+def _key(method: str, url: URL, params: Dict[str, Any]) -> Key:
+    return (
+        method.upper(),
+        url.path,
+        tuple(sorted(
+            (name, str(value)) for name, value in params.items()
+            if name != 'token'
+        )),
+    )
+
+
+class RecordTransport(Transport):
+    """The :class:`Transport` recording every exchange of another transport.
+
+    The exchanges are appended to a JSON lines file which can be served by
+    a :class:`ReplayTransport`. The token parameter is not recorded, the
+    response bodies are stored unchanged. Requests failing with a
+    :class:`TransportError` are recorded with their status, other errors
+    are not recorded. The exchanges are buffered and
+    written in batches from a worker thread, the rest is written by
+    :meth:`close`.
+
+    Parameters
+    ----------
+    transport: :class:`Transport`
+        The `Transport` whose exchanges are recorded.
+    path: Union[str, Path]
+        The path of the recording.
+    buffer: int
+        The number of exchanges written at once. Defaults to ``64``.
+    """
+
+    def __init__(
+            self,
+            transport: Transport,
+            path: Union[str, Path],
+            *,
+            buffer: int = 64,
+    ) -> None:
+        self.transport: Transport = transport
+        self.path: Path = Path(path)
+        self.buffer: int = buffer
+        self._fp = self.path.open('a', encoding='utf-8')
+        self._exchanges: list[Dict[str, Any]] = []
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def request(
+            self,
+            method: str,
+            url: URL,
+            params: Dict[str, Any],
+    ) -> str:
+        key: Key = _key(method, url, params)
+        try:
+            body: str = await self.transport.request(method, url, params)
+        except TransportError as error:
+            await self._record(key, error.message, error.status)
+            raise
+        await self._record(key, body)
+        return body
+
+    async def _record(
+            self,
+            key: Key,
+            body: str,
+            status: Optional[int] = None,
+    ) -> None:
+        method, path, query = key
+        exchange: Dict[str, Any] = {
+            'method': method,
+            'path': path,
+            'params': dict(query),
+            'body': body,
+        }
+        if status is not None:
+            exchange['status'] = status
+        self._exchanges.append(exchange)
+        if len(self._exchanges) >= self.buffer:
+            await self.flush()
+
+    def _write(self, exchanges: list[Dict[str, Any]]) -> None:
+        self._fp.writelines(
+            json.dumps(exchange) + '\n' for exchange in exchanges
+        )
+        self._fp.flush()
+
+    async def flush(self) -> None:
+        """Write the buffered exchanges to the recording."""
+        if self._lock is None:
+            # Python 3.9 binds a lock to the loop it is created on.
+            self._lock = asyncio.Lock()
+        # The lock keeps the batches in the order they were recorded.
+        async with self._lock:
+            exchanges, self._exchanges = self._exchanges, []
+            if exchanges:
+                await asyncio.to_thread(self._write, exchanges)
+
+    async def close(self) -> None:
+        await self.flush()
+        self._fp.close()
+        await self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """The :class:`Transport` serving a :class:`RecordTransport` recording.
+
+    Responses for the same request are served in the recorded order, the
+    last one is repeated once the recording is exhausted. Recorded errors
+    are raised as a :class:`TransportError` with their status.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        The path of the recording.
+    latency: float
+        The seconds to wait before every response. Defaults to ``0.0``.
+    """
+
+    def __init__(
+            self,
+            path: Union[str, Path],
+            *,
+            latency: float = 0.0,
+    ) -> None:
+        self.latency: float = latency
+        self.responses: Dict[Key, Deque[Response]] = defaultdict(deque)
+        with Path(path).open(encoding='utf-8') as fp:
+            for line in fp:
+                exchange: Dict[str, Any] = json.loads(line)
+                self.responses[(
+                    exchange['method'],
+                    exchange['path'],
+                    tuple(sorted(exchange['params'].items())),
+                )].append((exchange.get('status'), exchange['body']))
+
+    async def request(
+            self,
+            method: str,
+            url: URL,
+            params: Dict[str, Any],
+    ) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        responses: Optional[Deque[Response]] = self.responses.get(
+            _key(method, url, params),
+        )
+        if not responses:
+            raise TransportError(404, f'No recorded response for {url.path}')
+        status, body = \
+            responses.popleft() if len(responses) > 1 else responses[0]
+        if status is not None:
+            raise TransportError(status, body)
+        return body
@@ -17,7 +17,7 @@ from __future__ import annotations
 from typing import Union, Dict
 
 import azury.asynczury as asynczury
-from azury.utils import parse_iso
+from azury.decoder import decode_file, decode_team, decode_user
 
 __all__: list[str] = ['to_file', 'to_user', 'to_team']
 
@@ -47,25 +47,7 @@ async def to_file(
             File
                 The converted :class:`File` object.
             """
-    return asynczury.File(
-        client,
-        service,
-        team,
-        flags=data['flags'] if 'flags' in data else None,
-        id=data['_id'] if '_id' in data else data['id'],
-        archived='archived' in data['flags'] if 'flags' in data else None,
-        trashed='trashed' in data['flags'] if 'flags' in data else None,
-        favorite='favorite' in data['flags'] if 'flags' in data else None,
-        downloads=data['downloads'] if 'downloads' in data else None,
-        views=data['views'] if 'views' in data else None,
-        user=int(data['user']) if 'user' in data else int(data['author']),
-        name=data['name'],
-        size=data['size'],
-        type=data['type'],
-        created_at=parse_iso(data['createdAt'])
-        if 'createdAt' in data else parse_iso(data['uploadedAt']),
-        updated_at=parse_iso(data['updatedAt']),
-    )
+    return decode_file(asynczury.File, data, client, service, team)
 
 
 async def to_user(
@@ -86,19 +68,7 @@ async def to_user(
         User
             The converted :class:`User` object.
         """
-    return asynczury.User(
-        client,
-        avatar=data['avatar'],
-        flags=data['flags'],
-        connections=data['connections'],
-        access=data['access'],
-        id=int(data['_id']),
-        ip=data['ip'],
-        token=data['token'],
-        created_at=parse_iso(data['createdAt']),
-        updated_at=parse_iso(data['updatedAt']),
-        username=data['username'],
-    )
+    return decode_user(asynczury.User, data, client)
 
 
 async def to_team(
@@ -119,14 +89,4 @@ async def to_team(
         Team
             The converted :class:`Team` object.
         """
-    return asynczury.Team(
-        client,
-        members=[int(user) for user in data['members']],
-        icon=data['icon'],
-        flags=data['flags'],
-        id=data['_id'],
-        name=data['name'],
-        owner=int(data['owner']),
-        created_at=parse_iso(data['createdAt']),
-        updated_at=parse_iso(data['updatedAt']),
-    )
+    return decode_team(asynczury.Team, data, client)
@@ -0,0 +1,286 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use watchdog.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+from collections import Counter, deque, namedtuple
+from collections.abc import Sized
+from contextlib import contextmanager
+from time import perf_counter
+from types import TracebackType
+from typing import (
+    Any,
+    Awaitable,
+    Coroutine,
+    Deque,
+    Generator,
+    Iterator,
+    Optional,
+    Type,
+)
+
+__all__: list[str] = ['Watchdog', 'Event']
+logger: logging.Logger = logging.getLogger(__name__)
+
+Event = namedtuple('Event', 'blocked phase endpoint size')
+Slice = namedtuple('Slice', 'start end phase')
+
+
+class Watchdog:
+    """An opt-in monitor of the event loop lag caused by `asynczury`.
+
+    The `Watchdog` samples the event loop lag in a background task and
+    measures the synchronous time spent in the phases of the
+    :class:`asynczury.Client`: ``request`` (the transport code running
+    between awaits), ``decode`` (JSON decoding) and the ``to_file``,
+    ``to_user`` and ``to_team`` conversions.
+
+    Every phase execution is added to `totals`. The lag of a stall is
+    split separately into `stalled`, by the phases overlapping it, and the
+    rest is attributed to ``other``, i.e. code outside of `asynczury`.
+
+    Parameters
+    ----------
+    interval: float
+        The seconds between two lag samples. Defaults to ``0.01``.
+    threshold: float
+        The lag in seconds from which a sample is logged as a stall.
+        Defaults to ``0.05``.
+    top: int
+        The number of worst phase executions kept. Defaults to ``10``.
+    history: int
+        The number of recent phase slices kept for attributing stalls.
+        Defaults to ``4096``.
+
+    Attributes
+    ----------
+    totals: Counter[str]
+        The blocking seconds of all phase executions by phase.
+    stalled: Counter[str]
+        The lag of the stalls by overlapping phase, including ``other``.
+    stalls: int
+        The number of samples with a lag above the `threshold`.
+    max_lag: float
+        The largest sampled lag in seconds.
+
+    Examples
+    --------
+    >>> async def main() -> None:
+    ...     async with Watchdog() as watchdog:
+    ...         async with Client(token, watchdog=watchdog) as client:
+    ...             await (await client.user()).files()
+    ...     print(watchdog.report())
+    """
+
+    def __init__(
+            self,
+            *,
+            interval: float = 0.01,
+            threshold: float = 0.05,
+            top: int = 10,
+            history: int = 4096,
+    ) -> None:
+        self.interval: float = interval
+        self.threshold: float = threshold
+        self.top: int = top
+        self.totals: Counter[str] = Counter()
+        self.stalled: Counter[str] = Counter()
+        self.stalls: int = 0
+        self.max_lag: float = 0.0
+        self._worst: list[Event] = []
+        self._slices: Deque[Slice] = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> Watchdog:
+        self.start()
+        return self
+
+    async def __aexit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_value: Optional[BaseException],
+            exc_traceback: Optional[TracebackType],
+    ) -> None:
+        await self.stop()
+
+    def start(self) -> None:
+        """Start sampling the lag of the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(
+                self._sample(),
+            )
+
+    async def stop(self) -> None:
+        """Stop sampling the event loop lag."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sample(self) -> None:
+        while True:
+            start: float = perf_counter()
+            await asyncio.sleep(self.interval)
+            end: float = perf_counter()
+            self._lag(end - start - self.interval, end)
+
+    def _lag(self, lag: float, end: float) -> None:
+        self.max_lag = max(self.max_lag, lag)
+        if lag < self.threshold:
+            return
+        self.stalls += 1
+        attributed: Counter[str] = Counter()
+        for piece in self._slices:
+            overlap: float = min(piece.end, end) - max(piece.start, end - lag)
+            if overlap > 0:
+                attributed[piece.phase] += overlap
+        self.stalled.update(attributed)
+        self.stalled['other'] += max(lag - sum(attributed.values()), 0.0)
+        logger.warning(
+            f'Event loop blocked for {lag * 1000:.1f}ms '
+            f'({dict(attributed) or "other"})',
+        )
+
+    def _record(
+            self,
+            blocked: float,
+            phase: str,
+            endpoint: str,
+            size: int,
+    ) -> None:
+        self.totals[phase] += blocked
+        event: Event = Event(blocked, phase, endpoint, size)
+        if len(self._worst) < self.top:
+            heapq.heappush(self._worst, event)
+        elif blocked > self._worst[0].blocked:
+            heapq.heapreplace(self._worst, event)
+
+    @contextmanager
+    def phase(self, phase: str, endpoint: str, size: int) -> Iterator[None]:
+        """Measure a synchronous phase of the :class:`asynczury.Client`.
+
+        Parameters
+        ----------
+        phase: str
+            The name of the phase, e.g. ``'decode'``.
+        endpoint: str
+            The endpoint the processed payload belongs to.
+        size: int
+            The size of the processed payload, in bytes or records.
+        """
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            end: float = perf_counter()
+            self._slices.append(Slice(start, end, phase))
+            self._record(end - start, phase, endpoint, size)
+
+    async def measure(
+            self,
+            phase: str,
+            endpoint: str,
+            coro: Coroutine,
+    ) -> Any:
+        """Await a coroutine and measure the time it runs synchronously.
+
+        The length of the result, e.g. of a response body, is recorded as
+        the size.
+
+        Parameters
+        ----------
+        phase: str
+            The name of the phase, e.g. ``'request'``.
+        endpoint: str
+            The endpoint the coroutine requests.
+        coro: Coroutine
+            The coroutine to await.
+
+        Returns
+        -------
+        Any
+            The result of the `coro`.
+        """
+        timed: _Timed = _Timed(self, phase, coro)
+        result: Any = None
+        try:
+            result = await timed
+            return result
+        finally:
+            size: int = len(result) if isinstance(result, Sized) else 0
+            self._record(timed.blocked, phase, endpoint, size)
+
+    def offenders(self) -> list[Event]:
+        """Get the worst phase executions, the longest first."""
+        return sorted(self._worst, reverse=True)
+
+    def report(self) -> str:
+        """Get a human readable summary of the measurements."""
+        lines: list[str] = [
+            f'max lag {self.max_lag * 1000:.1f}ms, {self.stalls} stalls',
+            *(f'{phase}: {seconds * 1000:.1f}ms blocked'
+              for phase, seconds in self.totals.most_common()),
+            *(f'{phase}: {seconds * 1000:.1f}ms during stalls'
+              for phase, seconds in self.stalled.most_common()),
+            *(f'{event.blocked * 1000:.1f}ms {event.phase} '
+              f'{event.endpoint} ({event.size})'
+              for event in self.offenders()),
+        ]
+        return '\n'.join(lines)
+
+
+class _Timed(Awaitable):
+    def __init__(self, watchdog: Watchdog, phase: str, coro: Coroutine):
+        self.watchdog: Watchdog = watchdog
+        self.phase: str = phase
+        self.coro: Coroutine = coro
+        self.blocked: float = 0.0
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        return _drive(self)
+
+
+def _drive(timed: _Timed) -> Generator[Any, Any, Any]:
+    value: Any = None
+    error: Optional[BaseException] = None
+    while True:
+        done, result = _step(timed, value, error)
+        if done:
+            return result
+        value, error = None, None
+        try:
+            value = yield result
+        except BaseException as exc:
+            error = exc
+
+
+def _step(
+        timed: _Timed,
+        value: Any,
+        error: Optional[BaseException],
+) -> tuple[bool, Any]:
+    start: float = perf_counter()
+    try:
+        if error is not None:
+            return False, timed.coro.throw(error)
+        return False, timed.coro.send(value)
+    except StopIteration as stop:
+        return True, stop.value
+    finally:
+        end: float = perf_counter()
+        timed.watchdog._slices.append(Slice(start, end, timed.phase))
+        timed.blocked += end - start
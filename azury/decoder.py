@@ -0,0 +1,190 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use decoder.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+__all__: list[str] = [
+    'Field',
+    'MISSING',
+    'compile_decoder',
+    'parse_iso',
+    'FILE',
+    'USER',
+    'TEAM',
+    'decode_file',
+    'decode_user',
+    'decode_team',
+]
+
+MISSING: object = object()
+
+Field = namedtuple(
+    'Field',
+    'name keys convert default',
+    defaults=(None, MISSING),
+)
+Field.__doc__ = """The declarative specification of a decoded field.
+
+Parameters
+----------
+name: str
+    The keyword argument the decoded value is passed as.
+keys: tuple[str, ...]
+    The keys of the raw data, tried in order.
+convert: Optional[Callable[[Any], Any]]
+    The conversion applied to the found value. Defaults to ``None``.
+default: Any
+    The value used if none of the `keys` exist. If not given, a missing
+    field raises a :class:`KeyError`.
+"""
+
+
+def parse_iso(timestamp: str) -> datetime:
+    """A function to convert the ISO 8601 timestamp to :class:`datetime`.
+
+    Timestamps like ``2021-06-01T12:00:00.000Z`` are parsed by
+    :meth:`datetime.fromisoformat`, everything else falls back to
+    :meth:`datetime.strptime`. Timestamps without a time zone, including
+    dates only, raise a :class:`ValueError`.
+
+    Parameters
+    ----------
+    timestamp: str
+        The ISO 8601 timestamp to be converted.
+
+    Returns
+    -------
+    datetime
+        The converted :class:`datetime` timestamp.
+    """
+    if timestamp[-1:] == 'Z':
+        timestamp = timestamp[:-1] + '+00:00'
+    try:
+        parsed: Optional[datetime] = datetime.fromisoformat(timestamp)
+    except ValueError:
+        parsed = None
+    if parsed is None or parsed.tzinfo is None:
+        # strptime rejects what fromisoformat accepts without a time zone.
+        return datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S.%f%z')
+    return parsed
+
+
+def _lines(index: int, field: Field) -> list[str]:
+    value: str = f'v{index}'
+    lines: list[str] = [f'    {value} = get({field.keys[0]!r}, M)']
+    lines += [
+        f'    if {value} is M: {value} = get({key!r}, M)'
+        for key in field.keys[1:]
+    ]
+    convert: str = f'c{index}({value})' if field.convert else value
+    if field.default is MISSING:
+        lines += [
+            f'    if {value} is M: {value} = data[{field.keys[-1]!r}]',
+            f'    {value} = {convert}',
+        ]
+    else:
+        lines.append(f'    {value} = d{index} if {value} is M else {convert}')
+    return lines
+
+
+def compile_decoder(
+        name: str,
+        fields: tuple[Field, ...],
+) -> Callable[..., Any]:
+    """A function to compile field specifications into a decoder.
+
+    The returned ``decoder(factory, data, *args)`` looks up every field of
+    `data` once and returns ``factory(*args, **fields)``.
+
+    Parameters
+    ----------
+    name: str
+        The name of the decoded type, used for the function name.
+    fields: tuple[Field, ...]
+        The specifications of the decoded fields.
+
+    Returns
+    -------
+    Callable[..., Any]
+        The compiled decoder.
+    """
+    namespace: Dict[str, Any] = {'M': MISSING}
+    lines: list[str] = [
+        f'def decode_{name}(factory, data, *args):',
+        '    get = data.get',
+    ]
+    for index, field in enumerate(fields):
+        namespace[f'c{index}'] = field.convert
+        namespace[f'd{index}'] = field.default
+        lines += _lines(index, field)
+    lines.append('    return factory(*args, {})'.format(', '.join(
+        f'{field.name}=v{index}' for index, field in enumerate(fields)
+    )))
+    exec('\n'.join(lines), namespace)
+    return namespace[f'decode_{name}']
+
+
+def _flag(flag: str) -> Callable[[list[str]], bool]:
+    return lambda flags: flag in flags
+
+
+def _ints(values: list[str]) -> list[int]:
+    return [int(value) for value in values]
+
+
+FILE: tuple[Field, ...] = (
+    Field('flags', ('flags',), default=None),
+    Field('id', ('_id', 'id')),
+    Field('archived', ('flags',), _flag('archived'), None),
+    Field('trashed', ('flags',), _flag('trashed'), None),
+    Field('favorite', ('flags',), _flag('favorite'), None),
+    Field('downloads', ('downloads',), default=None),
+    Field('views', ('views',), default=None),
+    Field('user', ('user', 'author'), int),
+    Field('name', ('name',)),
+    Field('size', ('size',)),
+    Field('type', ('type',)),
+    Field('created_at', ('createdAt', 'uploadedAt'), parse_iso),
+    Field('updated_at', ('updatedAt',), parse_iso),
+)
+USER: tuple[Field, ...] = (
+    Field('avatar', ('avatar',)),
+    Field('flags', ('flags',)),
+    Field('connections', ('connections',)),
+    Field('access', ('access',)),
+    Field('id', ('_id',), int),
+    Field('ip', ('ip',)),
+    Field('token', ('token',)),
+    Field('created_at', ('createdAt',), parse_iso),
+    Field('updated_at', ('updatedAt',), parse_iso),
+    Field('username', ('username',)),
+)
+TEAM: tuple[Field, ...] = (
+    Field('members', ('members',), _ints),
+    Field('icon', ('icon',)),
+    Field('flags', ('flags',)),
+    Field('id', ('_id',)),
+    Field('name', ('name',)),
+    Field('owner', ('owner',), int),
+    Field('created_at', ('createdAt',), parse_iso),
+    Field('updated_at', ('updatedAt',), parse_iso),
+)
+
+decode_file: Callable[..., Any] = compile_decoder('file', FILE)
+decode_user: Callable[..., Any] = compile_decoder('user', USER)
+decode_team: Callable[..., Any] = compile_decoder('team', TEAM)
@@ -0,0 +1,340 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use exporter.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import abc
+import csv
+import json
+import logging
+from collections import namedtuple
+from datetime import datetime
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+from azury.types import File, Team
+from azury.utils import parse_size
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+__all__: list[str] = [
+    'Writer',
+    'JSONLWriter',
+    'CSVWriter',
+    'ParquetWriter',
+    'export',
+]
+logger: logging.Logger = logging.getLogger(__name__)
+
+Column = namedtuple('Column', 'name kind')
+Record = Union[File, Team]
+
+FILE_COLUMNS: tuple[Column, ...] = (
+    Column('id', 'string'),
+    Column('name', 'string'),
+    Column('type', 'string'),
+    Column('size', 'int'),
+    Column('user', 'int'),
+    Column('flags', 'strings'),
+    Column('archived', 'bool'),
+    Column('trashed', 'bool'),
+    Column('favorite', 'bool'),
+    Column('downloads', 'int'),
+    Column('views', 'int'),
+    Column('created_at', 'timestamp'),
+    Column('updated_at', 'timestamp'),
+)
+TEAM_COLUMNS: tuple[Column, ...] = (
+    Column('id', 'string'),
+    Column('name', 'string'),
+    Column('icon', 'string'),
+    Column('owner', 'int'),
+    Column('members', 'ints'),
+    Column('flags', 'strings'),
+    Column('created_at', 'timestamp'),
+    Column('updated_at', 'timestamp'),
+)
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {'size': parse_size}
+
+
+def columns(record: Record) -> tuple[Column, ...]:
+    """A function to get the export columns of a :class:`File` or
+    :class:`Team`.
+
+    Parameters
+    ----------
+    record: Union[File, Team]
+        The record whose columns should be returned.
+
+    Returns
+    -------
+    tuple[Column, ...]
+        The typed columns used by the writers.
+    """
+    if isinstance(record, File):
+        return FILE_COLUMNS
+    if isinstance(record, Team):
+        return TEAM_COLUMNS
+    raise TypeError(f'Cannot export {type(record).__name__} objects')
+
+
+def _row(record: Record, cols: tuple[Column, ...]) -> Dict[str, Any]:
+    row: Dict[str, Any] = {}
+    for column in cols:
+        value: Any = getattr(record, column.name)
+        converter: Optional[Callable] = _CONVERTERS.get(column.name)
+        row[column.name] = converter(value) if converter else value
+    return row
+
+
+def _isoformat(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class Writer(abc.ABC):
+    """The base class of the streaming record writers.
+
+    A `Writer` receives batches of records and appends them to the output
+    file, so only one batch has to be held in memory at any time.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        The path of the output file.
+    cols: tuple[Column, ...]
+        The typed columns to write.
+    """
+
+    def __init__(self, path: Union[str, Path], cols: tuple[Column, ...]):
+        self.path: Path = Path(path)
+        self.columns: tuple[Column, ...] = cols
+
+    def __enter__(self) -> Writer:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @abc.abstractmethod
+    def write(self, records: list[Record]) -> None:
+        """Write a batch of records to the output file."""
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """Flush and close the output file."""
+
+
+class JSONLWriter(Writer):
+    """The :class:`Writer` for newline delimited JSON files."""
+
+    def __init__(self, path: Union[str, Path], cols: tuple[Column, ...]):
+        super(JSONLWriter, self).__init__(path, cols)
+        self._fp = self.path.open('w', encoding='utf-8')
+
+    def write(self, records: list[Record]) -> None:
+        self._fp.writelines(
+            json.dumps(_row(record, self.columns), default=_isoformat) + '\n'
+            for record in records
+        )
+
+    def close(self) -> None:
+        self._fp.close()
+
+
+class CSVWriter(Writer):
+    """The :class:`Writer` for CSV files.
+
+    Lists are written as JSON arrays and timestamps as ISO 8601 strings.
+    """
+
+    def __init__(self, path: Union[str, Path], cols: tuple[Column, ...]):
+        super(CSVWriter, self).__init__(path, cols)
+        self._fp = self.path.open('w', encoding='utf-8', newline='')
+        self._writer: csv.writer = csv.writer(self._fp)
+        self._writer.writerow([column.name for column in cols])
+
+    def _cell(self, value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, list):
+            return json.dumps(value)
+        return value
+
+    def write(self, records: list[Record]) -> None:
+        self._writer.writerows(
+            map(self._cell, _row(record, self.columns).values())
+            for record in records
+        )
+
+    def close(self) -> None:
+        self._fp.close()
+
+
+def _require_pyarrow() -> None:
+    if pyarrow is None:
+        raise ImportError('pyarrow is required to export parquet files')
+
+
+class ParquetWriter(Writer):
+    """The :class:`Writer` for Parquet files.
+
+    Every batch is written as its own row group. Requires `pyarrow`.
+    """
+
+    def __init__(self, path: Union[str, Path], cols: tuple[Column, ...]):
+        _require_pyarrow()
+        super(ParquetWriter, self).__init__(path, cols)
+        types: Dict[str, pyarrow.DataType] = {
+            'string': pyarrow.string(),
+            'int': pyarrow.int64(),
+            'bool': pyarrow.bool_(),
+            'timestamp': pyarrow.timestamp('us', tz='UTC'),
+            'strings': pyarrow.list_(pyarrow.string()),
+            'ints': pyarrow.list_(pyarrow.int64()),
+        }
+        self.schema: pyarrow.Schema = pyarrow.schema(
+            [(column.name, types[column.kind]) for column in cols],
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+
+    def write(self, records: list[Record]) -> None:
+        self._writer.write_table(pyarrow.Table.from_pylist(
+            [_row(record, self.columns) for record in records],
+            schema=self.schema,
+        ))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+WRITERS: Dict[str, type[Writer]] = {
+    'jsonl': JSONLWriter,
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def writer_type(
+        path: Union[str, Path],
+        format: Optional[str] = None,
+) -> type[Writer]:
+    """A function to get the :class:`Writer` class for an output file.
+
+    The format is checked before any record is read, so an unsupported
+    format or a missing `pyarrow` fails before the export starts.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        The path of the output file.
+    format: Optional[str]
+        One of ``'jsonl'``, ``'csv'`` or ``'parquet'``. Defaults to the
+        suffix of the `path`.
+
+    Returns
+    -------
+    type[Writer]
+        The matching :class:`Writer` class.
+    """
+    format: str = (format or Path(path).suffix.lstrip('.')).lower()
+    if format not in WRITERS:
+        raise ValueError(f'Unsupported export format {format!r}')
+    if WRITERS[format] is ParquetWriter:
+        _require_pyarrow()
+    return WRITERS[format]
+
+
+def writer(
+        path: Union[str, Path],
+        cols: tuple[Column, ...],
+        format: Optional[str] = None,
+) -> Writer:
+    """A function to create the :class:`Writer` for an output file.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        The path of the output file.
+    cols: tuple[Column, ...]
+        The typed columns to write.
+    format: Optional[str]
+        One of ``'jsonl'``, ``'csv'`` or ``'parquet'``. Defaults to the
+        suffix of the `path`.
+
+    Returns
+    -------
+    Writer
+        The matching :class:`Writer`.
+    """
+    return writer_type(path, format)(path, cols)
+
+
+def batches(records: Iterable[Record], size: int) -> Iterator[list[Record]]:
+    """A function to split the records into lists of `size` records."""
+    iterator: Iterator[Record] = iter(records)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def export(
+        records: Iterable[Record],
+        path: Union[str, Path],
+        format: Optional[str] = None,
+        *,
+        batch_size: int = 1000,
+) -> int:
+    """A function to stream :class:`File` or :class:`Team` records to a
+    JSONL, CSV or Parquet file.
+
+    The records are consumed lazily and written in batches of `batch_size`,
+    so generators keep the memory usage bounded.
+
+    Parameters
+    ----------
+    records: Iterable[Union[File, Team]]
+        The records to export, all of the same type.
+    path: Union[str, Path]
+        The path of the output file.
+    format: Optional[str]
+        One of ``'jsonl'``, ``'csv'`` or ``'parquet'``. Defaults to the
+        suffix of the `path`.
+    batch_size: int
+        The number of records written at once. Defaults to ``1000``.
+
+    Returns
+    -------
+    int
+        The number of exported records.
+    """
+    factory: type[Writer] = writer_type(path, format)
+    iterator: Iterator[Record] = iter(records)
+    first: Optional[Record] = next(iterator, None)
+    if first is None:
+        return 0
+
+    count: int = 0
+    with factory(path, columns(first)) as output:
+        for batch in batches(chain([first], iterator), batch_size):
+            output.write(batch)
+            count += len(batch)
+    logger.info(f'Exported {count} records to {path}')
+    return count
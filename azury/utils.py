@@ -14,28 +14,48 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict, Union
+import re
+from typing import Dict, Optional, Union
 
+from azury.decoder import decode_file, decode_team, decode_user, parse_iso
 from azury.types import User, Team, File
 
-__all__: list[str] = ['parse_iso', 'to_user', 'to_team', 'to_file']
+__all__: list[str] = [
+    'parse_iso',
+    'parse_size',
+    'to_user',
+    'to_team',
+    'to_file',
+]
 
+_SIZE: re.Pattern = re.compile(
+    r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*$',
+    re.IGNORECASE,
+)
+_UNITS: Dict[str, int] = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30,
+                          'T': 1 << 40}
 
-def parse_iso(timestamp: str) -> datetime:
-    """A function to convert the ISO 8601 timestamp to :class:`datetime`.
+
+def parse_size(size: Union[str, int, None]) -> Optional[int]:
+    """A function to convert the files' size to a number of bytes.
 
     Parameters
     ----------
-    timestamp: str
-        The ISO 8601 timestamp to be converted.
+    size: Union[str, int, None]
+        The size as returned by azury.gg, either a plain byte count or a
+        human readable value like ``'1.5 MB'``.
 
     Returns
     -------
-    datetime
-        The converted :class:`datetime` timestamp.
+    Optional[int]
+        The size in bytes, or ``None`` if it could not be parsed.
     """
-    return datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S.%f%z')
+    if size is None or isinstance(size, int):
+        return size
+    match: Optional[re.Match] = _SIZE.match(str(size))
+    if match is None:
+        return None
+    return int(float(match[1]) * _UNITS[match[2].upper()])
 
 
 def to_user(data: Dict[str, Union[str, list]]) -> User:
@@ -51,18 +71,7 @@ def to_user(data: Dict[str, Union[str, list]]) -> User:
     User
         The converted :class:`User` object.
     """
-    return User(
-        avatar=data['avatar'],
-        flags=data['flags'],
-        connections=data['connections'],
-        access=data['access'],
-        id=int(data['_id']),
-        ip=data['ip'],
-        token=data['token'],
-        created_at=parse_iso(data['createdAt']),
-        updated_at=parse_iso(data['updatedAt']),
-        username=data['username'],
-    )
+    return decode_user(User, data)
 
 
 def to_team(data: Dict[str, Union[str, list]]) -> Team:
@@ -78,16 +87,7 @@ def to_team(data: Dict[str, Union[str, list]]) -> Team:
         Team
             The converted :class:`Team` object.
         """
-    return Team(
-        members=[int(user) for user in data['members']],
-        icon=data['icon'],
-        flags=data['flags'],
-        id=data['_id'],
-        name=data['name'],
-        owner=int(data['owner']),
-        created_at=parse_iso(data['createdAt']),
-        updated_at=parse_iso(data['updatedAt']),
-    )
+    return decode_team(Team, data)
 
 
 def to_file(data: Dict[str, Union[str, bool, int, list]]) -> File:
@@ -103,18 +103,4 @@ def to_file(data: Dict[str, Union[str, bool, int, list]]) -> File:
         File
             The converted :class:`File` object.
         """
-    return File(
-        flags=data['flags'],
-        id=data['_id'],
-        archived='archived' in data['flags'],
-        trashed='trashed' in data['flags'],
-        favorite='favorite' in data['flags'],
-        downloads=data['downloads'] if 'downloads' in data else None,
-        views=data['views'] if 'views' in data else None,
-        user=int(data['user']),
-        name=data['name'],
-        size=data['size'],
-        type=data['type'],
-        created_at=parse_iso(data['createdAt']),
-        updated_at=parse_iso(data['updatedAt']),
-    )
+    return decode_file(File, data)
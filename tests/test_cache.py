@@ -0,0 +1,74 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use test_cache.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from time import perf_counter
+
+from azury.asynczury.cache import SharedCache
+
+
+class _Fetch:
+    def __init__(self, body: str = '{}') -> None:
+        self.body: str = body
+        self.calls: int = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        return self.body
+
+
+def test_fetch_once(tmp_path):
+    cache = SharedCache(tmp_path / 'cache.sqlite3')
+    fetch = _Fetch()
+
+    async def main() -> list[str]:
+        return await asyncio.gather(*(
+            cache.fetch('token', 'users/data', fetch) for _ in range(8)
+        ))
+    assert asyncio.run(main()) == ['{}'] * 8
+    assert fetch.calls == 1
+    cache.invalidate('token')
+    assert asyncio.run(cache.fetch('token', 'users/data', fetch)) == '{}'
+    assert fetch.calls == 2
+    cache.close()
+
+
+def test_locked_database(tmp_path):
+    cache = SharedCache(tmp_path / 'cache.sqlite3', busy=0.2)
+    cache.connection.execute('SELECT 1')
+    writer = sqlite3.connect(tmp_path / 'cache.sqlite3', isolation_level=None)
+    writer.execute('BEGIN IMMEDIATE')
+    fetch = _Fetch()
+
+    async def main() -> tuple[str, float]:
+        start: float = perf_counter()
+        ticks: int = 0
+        task = asyncio.ensure_future(
+            cache.fetch('token', 'users/data', fetch),
+        )
+        while not task.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        return await task, ticks / (perf_counter() - start)
+    body, rate = asyncio.run(main())
+    writer.rollback()
+    writer.close()
+    assert body == '{}'
+    assert fetch.calls == 1
+    # The event loop kept running while the database was locked.
+    assert rate > 20
+    cache.close()
@@ -0,0 +1,47 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use test_client.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+
+from azury.asynczury import Client, FakeAzury, FakeTransport, Snapshot
+
+
+async def _files(client: Client) -> list[str]:
+    async with client:
+        user = await client.user()
+        return [file.id for file in await user.files()]
+
+
+async def _delete(client: Client, id: str) -> bool:
+    async with client:
+        user = await client.user()
+        return await (await user.get(id)).delete()
+
+
+def test_mutation_drops_snapshot(tmp_path):
+    server = FakeAzury(files=5)
+
+    def client() -> Client:
+        # Every client stands for a new process sharing the snapshot.
+        return Client(
+            'TOKEN',
+            transport=FakeTransport(server),
+            snapshot=Snapshot(tmp_path),
+        )
+    ids: list[str] = asyncio.run(_files(client()))
+    assert asyncio.run(_delete(client(), ids[0]))
+    assert asyncio.run(_files(client())) == ids[1:]
+    assert asyncio.run(_delete(client(), ids[1]))
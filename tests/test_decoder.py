@@ -0,0 +1,136 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use test_decoder.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+import pytest
+
+import azury.asynczury.utils as async_utils
+import azury.utils as utils
+from azury.decoder import parse_iso
+
+CREATED: str = '2021-06-01T12:00:00.000Z'
+UPDATED: str = '2021-06-02T08:30:15.250+02:00'
+FILE: Dict[str, Any] = {
+    '_id': 'abc', 'flags': ['favorite'], 'downloads': 3, 'views': 7,
+    'user': '42', 'name': 'holiday.png', 'size': '1.5 MB',
+    'type': 'image/png', 'createdAt': CREATED, 'updatedAt': UPDATED,
+}
+USER: Dict[str, Any] = {
+    'avatar': 'avatar.png', 'flags': [], 'connections': [], 'access': [],
+    '_id': '42', 'ip': '127.0.0.1', 'token': 'TOKEN', 'username': 'name',
+    'createdAt': CREATED, 'updatedAt': UPDATED,
+}
+TEAM: Dict[str, Any] = {
+    'members': ['42', '43'], 'icon': 'icon.png', 'flags': [], '_id': 'team',
+    'name': 'team', 'owner': '42', 'createdAt': CREATED, 'updatedAt': UPDATED,
+}
+
+
+def _decode(package: str, kind: str, data: Dict[str, Any]) -> Dict:
+    if package == 'azury':
+        return asdict(getattr(utils, f'to_{kind}')(data))
+    if kind == 'file':
+        decoded = async_utils.to_file(None, 'users', data)
+    else:
+        decoded = getattr(async_utils, f'to_{kind}')(None, data)
+    return asdict(asyncio.run(decoded))
+
+
+def _renamed(data: Dict[str, Any], old: str, new: str) -> Dict[str, Any]:
+    renamed: Dict[str, Any] = dict(data)
+    renamed[new] = renamed.pop(old)
+    return renamed
+
+
+@pytest.mark.parametrize('timestamp, expected', [
+    (CREATED, datetime(2021, 6, 1, 12, tzinfo=timezone.utc)),
+    (UPDATED, datetime(
+        2021, 6, 2, 8, 30, 15, 250000, timezone(timedelta(hours=2)),
+    )),
+])
+def test_parse_iso(timestamp, expected):
+    assert parse_iso(timestamp) == expected
+
+
+@pytest.mark.parametrize('timestamp', [
+    '2021-06-01', '2021-06-01T12:00:00', '2021-06-01T12:00:00.000', 'now',
+])
+def test_parse_iso_requires_time_zone(timestamp):
+    with pytest.raises(ValueError):
+        parse_iso(timestamp)
+
+
+@pytest.mark.parametrize('package', ['azury', 'asynczury'])
+def test_file(package):
+    file: Dict = _decode(package, 'file', FILE)
+    assert file['id'] == 'abc'
+    assert file['user'] == 42
+    assert (file['favorite'], file['archived'], file['trashed']) == \
+        (True, False, False)
+    assert file['created_at'] == parse_iso(CREATED)
+    assert file['updated_at'] == parse_iso(UPDATED)
+
+
+@pytest.mark.parametrize('package', ['azury', 'asynczury'])
+@pytest.mark.parametrize('old, new', [
+    ('_id', 'id'), ('user', 'author'), ('createdAt', 'uploadedAt'),
+])
+def test_file_fallbacks(package, old, new):
+    assert _decode(package, 'file', _renamed(FILE, old, new)) == \
+        _decode(package, 'file', FILE)
+
+
+@pytest.mark.parametrize('package', ['azury', 'asynczury'])
+def test_file_optional_fields(package):
+    data: Dict[str, Any] = {
+        key: value for key, value in FILE.items()
+        if key not in ('flags', 'downloads', 'views')
+    }
+    file: Dict = _decode(package, 'file', data)
+    assert file['flags'] is None
+    assert file['favorite'] is None
+    assert file['downloads'] is None
+
+
+@pytest.mark.parametrize('package', ['azury', 'asynczury'])
+def test_user_and_team(package):
+    user: Dict = _decode(package, 'user', USER)
+    assert user['id'] == 42
+    assert user['created_at'] == parse_iso(CREATED)
+    team: Dict = _decode(package, 'team', TEAM)
+    assert team['members'] == [42, 43]
+    assert team['owner'] == 42
+    assert team['updated_at'] == parse_iso(UPDATED)
+
+
+@pytest.mark.parametrize('package', ['azury', 'asynczury'])
+@pytest.mark.parametrize('kind, data, key', [
+    ('file', FILE, '_id'),
+    ('file', FILE, 'user'),
+    ('file', FILE, 'createdAt'),
+    ('file', FILE, 'name'),
+    ('user', USER, '_id'),
+    ('team', TEAM, 'owner'),
+])
+def test_missing_key(package, kind, data, key):
+    missing: Dict[str, Any] = dict(data)
+    del missing[key]
+    with pytest.raises(KeyError):
+        _decode(package, kind, missing)
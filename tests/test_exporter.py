@@ -0,0 +1,128 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use test_exporter.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator
+
+import pytest
+
+import azury.asynczury as asynczury
+import azury.exporter as exporter
+from azury.types import File
+
+CREATED: datetime = datetime(2021, 6, 1, 12, tzinfo=timezone.utc)
+
+
+def _file(index: int) -> File:
+    return File(
+        flags=['favorite'], id=f'id{index}', archived=False, trashed=False,
+        favorite=True, downloads=index, views=0, user=42,
+        name=f'file {index}.png', size='1.5 KB', type='image/png',
+        created_at=CREATED, updated_at=CREATED,
+    )
+
+
+def _counted(consumed: list[int], count: int) -> Iterator[File]:
+    for index in range(count):
+        consumed.append(index)
+        yield _file(index)
+
+
+def _check(row: Dict[str, Any], index: int) -> None:
+    assert row['id'] == f'id{index}'
+    assert int(row['size']) == 1536
+    assert int(row['downloads']) == index
+    assert datetime.fromisoformat(row['created_at']) == CREATED
+
+
+def test_jsonl(tmp_path):
+    path = tmp_path / 'files.jsonl'
+    files: Iterator[File] = (_file(index) for index in range(5))
+    assert exporter.export(files, path, batch_size=2) == 5
+    rows: list[Dict] = [
+        json.loads(line) for line in path.read_text().splitlines()
+    ]
+    assert len(rows) == 5
+    for index, row in enumerate(rows):
+        _check(row, index)
+        assert row['size'] == 1536
+        assert row['flags'] == ['favorite']
+        assert row['favorite'] is True
+
+
+def test_csv(tmp_path):
+    path = tmp_path / 'files.csv'
+    assert exporter.export([_file(0), _file(1)], path) == 2
+    with path.open(newline='') as fp:
+        rows: list[Dict] = list(csv.DictReader(fp))
+    assert list(rows[0]) == [column.name for column in exporter.FILE_COLUMNS]
+    for index, row in enumerate(rows):
+        _check(row, index)
+        assert json.loads(row['flags']) == ['favorite']
+
+
+@pytest.mark.parametrize('format', ['jsonl', 'csv'])
+def test_async_export(tmp_path, format):
+    server = asynczury.FakeAzury(files=25)
+    path = tmp_path / f'files.{format}'
+
+    async def main() -> int:
+        transport = asynczury.FakeTransport(server)
+        async with asynczury.Client('TOKEN', transport=transport) as client:
+            user = await client.user()
+            return await asynczury.export(
+                user.iter_files(), path, batch_size=10,
+            )
+    assert asyncio.run(main()) == 25
+    assert len(path.read_text().splitlines()) == 25 + (format == 'csv')
+
+
+def test_unsupported_format(tmp_path):
+    consumed: list[int] = []
+    with pytest.raises(ValueError):
+        exporter.export(_counted(consumed, 5), tmp_path / 'files.xlsx')
+    with pytest.raises(ValueError):
+        asyncio.run(asynczury.export(
+            _counted(consumed, 5), tmp_path / 'files.xlsx',
+        ))
+    assert consumed == []
+
+
+def test_missing_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter, 'pyarrow', None)
+    consumed: list[int] = []
+    with pytest.raises(ImportError):
+        asyncio.run(asynczury.export(
+            _counted(consumed, 5), tmp_path / 'files.parquet',
+        ))
+    assert consumed == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parquet(tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+
+    path = tmp_path / 'files.parquet'
+    assert exporter.export([_file(0), _file(1)], path) == 2
+    table = pyarrow.parquet.read_table(path)
+    assert table.schema.field('size').type == pyarrow.int64()
+    assert table.schema.field('created_at').type == \
+        pyarrow.timestamp('us', tz='UTC')
+    assert table.column('size').to_pylist() == [1536, 1536]
@@ -0,0 +1,122 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use test_pipeline.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+from typing import Iterator
+
+import pytest
+
+from azury.asynczury.pipeline import Pipeline
+
+
+def _pending() -> int:
+    current: asyncio.Task = asyncio.current_task()
+    return sum(
+        1 for task in asyncio.all_tasks()
+        if task is not current and not task.done()
+    )
+
+
+def test_map_filter():
+    async def double(item: int) -> int:
+        await asyncio.sleep(0)
+        return item * 2
+
+    pipeline: Pipeline = Pipeline(range(10)).map(double) \
+        .filter(lambda item: item % 4 == 0)
+    assert asyncio.run(pipeline.collect()) == [0, 4, 8, 12, 16]
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_failure_stops_all_stages(concurrency):
+    acted: list[int] = []
+
+    async def act(item: int) -> int:
+        await asyncio.sleep(0.001)
+        if item == 3:
+            raise ValueError(item)
+        acted.append(item)
+        return item
+
+    async def main() -> tuple[int, int]:
+        with pytest.raises(ValueError):
+            await Pipeline(range(1000), buffer=64) \
+                .map(act, concurrency=concurrency) \
+                .map(act, concurrency=concurrency) \
+                .run()
+        count: int = len(acted)
+        await asyncio.sleep(0.05)
+        return count, _pending()
+
+    count, pending = asyncio.run(main())
+    assert len(acted) == count
+    assert pending == 0
+
+
+def test_source_failure():
+    async def source():
+        yield 1
+        raise ValueError('source')
+
+    async def main() -> None:
+        await Pipeline(source()).map(lambda item: item).run()
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+
+def test_early_break():
+    seen: list[int] = []
+
+    def see(item: int) -> int:
+        seen.append(item)
+        return item
+
+    async def main() -> tuple[int, int]:
+        async for _ in Pipeline(itertools.count(), buffer=4).map(see):
+            break
+        await asyncio.sleep(0.01)
+        count: int = len(seen)
+        await asyncio.sleep(0.05)
+        return count, _pending()
+
+    count, pending = asyncio.run(main())
+    assert len(seen) == count
+    assert pending == 0
+
+
+def _counting(produced: list[int]) -> Iterator[int]:
+    for item in itertools.count():
+        produced.append(item)
+        yield item
+
+
+def test_backpressure():
+    produced: list[int] = []
+
+    async def main() -> int:
+        taken: int = 0
+        pipeline: Pipeline = Pipeline(_counting(produced), buffer=4)
+        async for _ in pipeline.map(lambda item: item):
+            taken += 1
+            await asyncio.sleep(0.01)
+            if taken == 10:
+                break
+        return len(produced)
+
+    # Two queues of four items, one item in the worker, one being put.
+    assert asyncio.run(main()) <= 10 + 2 * 4 + 2
@@ -0,0 +1,178 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use test_scheduler.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import azury.asynczury.scheduler as scheduler_module
+from azury.asynczury import (
+    Client,
+    DeadlineExceeded,
+    FakeAzury,
+    FakeTransport,
+    Priority,
+    Scheduler,
+    TransportError,
+)
+
+
+async def _admitted(
+        scheduler: Scheduler,
+        value: Priority,
+        order: list[Priority],
+) -> None:
+    await scheduler.acquire(value)
+    order.append(value)
+
+
+def test_queue_order():
+    scheduler = Scheduler(initial=1, reserved=0)
+    order: list[Priority] = []
+
+    async def main() -> None:
+        await scheduler.acquire()
+        tasks = [
+            asyncio.ensure_future(_admitted(scheduler, value, order))
+            for value in (Priority.BULK, Priority.INTERACTIVE, Priority.BULK)
+        ]
+        await asyncio.sleep(0)
+        assert order == []
+        for _ in tasks:
+            scheduler.release(0.0)
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+    asyncio.run(main())
+    assert order == [Priority.INTERACTIVE, Priority.BULK, Priority.BULK]
+
+
+def test_reserved_slot():
+    scheduler = Scheduler(initial=3, reserved=1)
+    order: list[Priority] = []
+
+    async def main() -> None:
+        await scheduler.acquire(Priority.BULK)
+        await scheduler.acquire(Priority.BULK)
+        bulk = asyncio.ensure_future(
+            _admitted(scheduler, Priority.BULK, order),
+        )
+        await asyncio.sleep(0)
+        assert order == []
+        await _admitted(scheduler, Priority.INTERACTIVE, order)
+        assert scheduler.in_flight == 3
+        scheduler.release(0.0)
+        scheduler.release(0.0)
+        await bulk
+    asyncio.run(main())
+    assert order == [Priority.INTERACTIVE, Priority.BULK]
+
+
+def test_cancel_queued():
+    scheduler = Scheduler(initial=1)
+
+    async def main() -> None:
+        await scheduler.acquire()
+        queued = asyncio.ensure_future(scheduler.acquire())
+        woken = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0)
+        queued.cancel()
+        await asyncio.sleep(0)
+        assert len(scheduler.queues[Priority.INTERACTIVE]) == 1
+        # Admitted by the release, but cancelled before it could run.
+        scheduler.release(0.0)
+        woken.cancel()
+        await asyncio.gather(queued, woken, return_exceptions=True)
+        assert scheduler.in_flight == 0
+        await asyncio.wait_for(scheduler.acquire(), 1.0)
+    asyncio.run(main())
+    assert scheduler.in_flight == 1
+
+
+def test_aimd(monkeypatch):
+    now: list[float] = [100.0]
+    monkeypatch.setattr(scheduler_module, 'monotonic', lambda: now[0])
+    scheduler = Scheduler(initial=4, target=1.0, backoff=0.5)
+    scheduler.in_flight = 8
+    for _ in range(4):
+        scheduler.release(0.1)
+    assert 4.9 < scheduler.limit < 5.0
+    scheduler.release(0.1, error=True)
+    # A second congestion signal within one latency is the same event.
+    scheduler.release(0.1, error=True)
+    assert 2.4 < scheduler.limit < 2.5
+    now[0] += 0.5
+    scheduler.release(2.0)
+    assert 2.4 < scheduler.limit < 2.5
+    now[0] += 2.0
+    scheduler.release(2.0)
+    assert 1.2 < scheduler.limit < 1.25
+    assert scheduler.in_flight == 0
+
+
+async def _fail(scheduler: Scheduler, status: int) -> None:
+    with pytest.raises(TransportError):
+        async with scheduler.slot():
+            raise TransportError(status, 'error')
+
+
+@pytest.mark.parametrize('status, overloaded', [
+    (404, False), (429, True), (503, True),
+])
+def test_slot_errors(status, overloaded):
+    scheduler = Scheduler(initial=4)
+    asyncio.run(_fail(scheduler, status))
+    assert (scheduler.limit < 4) is overloaded
+    assert scheduler.in_flight == 0
+
+
+def test_error_statuses():
+    server = FakeAzury(files=1)
+
+    async def main() -> None:
+        async with Client('TOKEN', transport=FakeTransport(server)) as client:
+            user = await client.user()
+            file = (await user.files())[0]
+            assert await file.delete()
+            assert not await file.delete()
+        failing = FakeTransport(server, error_rate=1.0)
+        async with Client('TOKEN', transport=failing) as client:
+            with pytest.raises(TransportError):
+                await client.user()
+    asyncio.run(main())
+
+
+async def _attempt(client: Client) -> None:
+    try:
+        await client.user()
+    except DeadlineExceeded:
+        pass
+
+
+def test_timeouts_decrease_limit():
+    scheduler = Scheduler(initial=8, target=1.0)
+    client = Client(
+        'token',
+        transport=FakeTransport(latency=0.2),
+        scheduler=scheduler,
+        timeout=0.05,
+    )
+
+    async def main() -> None:
+        for _ in range(3):
+            await asyncio.gather(*(_attempt(client) for _ in range(8)))
+    asyncio.run(main())
+    assert scheduler.limit < 8
+    assert scheduler.in_flight == 0
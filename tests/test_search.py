@@ -0,0 +1,182 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use test_search.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import heapq
+import os
+import random
+from dataclasses import replace
+from datetime import datetime
+from time import perf_counter
+
+import pytest
+
+from azury.search import FileIndex, trigrams
+from azury.types import File
+from azury.utils import parse_size
+
+WORDS: tuple[str, ...] = (
+    'holiday', 'beach', 'report', 'invoice', 'family', 'party', 'scan',
+    'draft', 'final', 'summer', 'winter', 'photo', 'video', 'budget',
+)
+TYPES: dict[str, str] = {
+    'png': 'image/png',
+    'pdf': 'application/pdf',
+    'mp4': 'video/mp4',
+    'txt': 'text/plain',
+}
+QUERIES: tuple[str, ...] = (
+    '', 'h', 'ho', 'hol', 'holiday', 'png', 'y-b', 'ay-w', '9', 'zz', 'XYZ',
+)
+
+
+def _file(id: str, name: str, size: str = '1', **fields) -> File:
+    now: datetime = datetime(2021, 1, 1)
+    return File(
+        **{
+            'flags': [], 'id': id, 'archived': False, 'trashed': False,
+            'favorite': False, 'downloads': 0, 'views': 0, 'user': 1,
+            'name': name, 'size': size, 'type': 'image/png',
+            'created_at': now, 'updated_at': now, **fields,
+        },
+    )
+
+
+def _files(count: int, seed: int = 0) -> list[File]:
+    generator: random.Random = random.Random(seed)
+    files: list[File] = []
+    for index in range(count):
+        extension: str = generator.choice(tuple(TYPES))
+        words: list[str] = generator.sample(WORDS, generator.randint(1, 3))
+        files.append(_file(
+            f'id{index}',
+            f'{"-".join(words)}-{generator.randrange(10 ** 4)}.{extension}',
+            str(generator.randrange(1, 1 << 24)),
+            type=TYPES[extension],
+            flags=['favorite'] if generator.random() < 0.1 else [],
+        ))
+    return files
+
+
+def _search(files, text, limit=None, type=None, flags=(), min_size=None):
+    found: list[File] = [
+        file for file in files if all((
+            text.lower() in file.name.lower(),
+            type is None or file.type == type,
+            set(flags).issubset(file.flags),
+            min_size is None or parse_size(file.size) >= min_size,
+        ))
+    ]
+    found.sort(key=lambda file: (len(file.name), file.name.lower(), file.id))
+    return found[:limit]
+
+
+def _fuzzy(files, text, limit=10):
+    grams: set[str] = trigrams(f'  {text.lower()} ')
+
+    def score(file: File) -> tuple[float, str]:
+        name: str = file.name.lower()
+        count: int = len(grams & trigrams(f'  {name} '))
+        return count / (len(grams) + len(name) + 1 - count), file.id
+    scores = [score(file) for file in files]
+    return [
+        id for value, id in heapq.nlargest(limit, scores) if value > 0
+    ]
+
+
+@pytest.fixture(scope='module')
+def files() -> list[File]:
+    return _files(2000)
+
+
+@pytest.fixture(scope='module')
+def index(files) -> FileIndex:
+    return FileIndex(files)
+
+
+@pytest.mark.parametrize('text', QUERIES)
+@pytest.mark.parametrize('limit', [None, 1, 20])
+def test_search(files, index, text, limit):
+    assert index.search(text, limit=limit) == _search(files, text, limit)
+
+
+@pytest.mark.parametrize('text', QUERIES)
+def test_search_filters(files, index, text):
+    options: dict = {'type': 'image/png', 'flags': ['favorite']}
+    assert index.search(text, limit=5, **options) == \
+        _search(files, text, 5, **options)
+    assert index.search(text, min_size=1 << 23) == \
+        _search(files, text, min_size=1 << 23)
+
+
+@pytest.mark.parametrize('text', ['holidy', 'beach-party', 'reprot', 'x'])
+def test_fuzzy(files, index, text):
+    found: list[str] = [file.id for file in index.fuzzy(text)]
+    assert found == _fuzzy(files, text)
+
+
+def test_update_duplicates():
+    file: File = _file('a', 'holiday.png', '10')
+    index: FileIndex = FileIndex([file, replace(file, name='beach.png')])
+    assert len(index) == 1
+    assert index.search('holiday') == []
+    assert index.search('beach') == [replace(file, name='beach.png')]
+    other: File = _file('b', 'holiday.png', '20')
+    index.update([other, file, file])
+    assert index.filter(min_size=20) == [other]
+    assert index.filter(max_size=10) == [file]
+
+
+def test_update_and_remove(files):
+    index: FileIndex = FileIndex(files[:100])
+    renamed: list[File] = [
+        replace(file, name=f'renamed {file.name}') for file in files[:10]
+    ]
+    index.update(renamed + files[100:200])
+    index.remove(files[150])
+    index.remove('missing')
+    expected: list[File] = renamed + files[10:150] + files[151:200]
+    assert len(index) == len(expected)
+    for text in QUERIES + ('renamed',):
+        assert index.search(text) == _search(expected, text)
+    assert index.fuzzy('renamed') == [
+        index.files[id] for id in _fuzzy(expected, 'renamed')
+    ]
+    assert sorted(file.id for file in index.filter(min_size=1 << 23)) == \
+        sorted(file.id for file in _search(expected, '', min_size=1 << 23))
+
+
+def _best(function, repeat: int = 5) -> float:
+    times: list[float] = []
+    for _ in range(repeat):
+        start: float = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+@pytest.mark.skipif(
+    not os.environ.get('AZURY_BENCHMARK'),
+    reason='set AZURY_BENCHMARK to run the benchmarks',
+)
+def test_performance():
+    index: FileIndex = FileIndex(_files(100_000))
+    for text in QUERIES:
+        assert _best(lambda: index.search(text, limit=20)) < 0.001, text
+    for text in ('holidy', 'reprot', 'beach-party'):
+        assert _best(lambda: index.fuzzy(text)) < 0.002, text
+    # Fragments shared by many names read most of their postings.
+    for text in ('day_fin', 'summer photo'):
+        assert _best(lambda: index.fuzzy(text)) < 0.1, text
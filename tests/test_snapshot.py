@@ -0,0 +1,89 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use test_snapshot.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import json
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from azury.asynczury.snapshot import Snapshot
+
+
+def _user(updated_at: str) -> str:
+    return json.dumps({'user': {'updatedAt': updated_at}})
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    snapshot = Snapshot(tmp_path, ttl=10.0)
+    snapshot.put('token', 'users/files', '[]')
+    assert snapshot.get('token', 'users/files') == '[]'
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 11.0)
+    assert snapshot.get('token', 'users/files') is None
+
+
+def test_reload_from_disk(tmp_path):
+    Snapshot(tmp_path).put('token', 'users/data', _user('a'))
+    path = Snapshot(tmp_path).path('token')
+    assert Snapshot(tmp_path).get('token', 'users/data') == _user('a')
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_updated_at_invalidation(tmp_path):
+    snapshot = Snapshot(tmp_path)
+    snapshot.put('token', 'users/data', _user('a'))
+    snapshot.put('token', 'users/files', '[]')
+    snapshot.put('token', 'users/data', _user('a'))
+    assert snapshot.get('token', 'users/files') == '[]'
+    snapshot.put('token', 'users/data', _user('b'))
+    assert snapshot.get('token', 'users/files') is None
+    assert Snapshot(tmp_path).get('token', 'users/files') is None
+
+
+def test_entries_before_first_user(tmp_path):
+    snapshot = Snapshot(tmp_path)
+    snapshot.put('token', 'users/teams', '[]')
+    snapshot.put('token', 'users/data', _user('a'))
+    assert snapshot.get('token', 'users/teams') == '[]'
+
+
+def test_invalidate(tmp_path):
+    snapshot = Snapshot(tmp_path)
+    snapshot.put('token', 'users/files', '[]')
+    snapshot.put('other', 'users/files', '[]')
+    snapshot.invalidate('token')
+    snapshot.invalidate('missing')
+    assert snapshot.get('token', 'users/files') is None
+    assert Snapshot(tmp_path).get('token', 'users/files') is None
+    assert Snapshot(tmp_path).get('other', 'users/files') == '[]'
+
+
+def _puts(snapshot: Snapshot, endpoint: str) -> None:
+    for index in range(50):
+        snapshot.put('token', endpoint, str(index))
+
+
+def test_concurrent_puts(tmp_path):
+    snapshot = Snapshot(tmp_path)
+    endpoints = [f'endpoint/{index}' for index in range(8)]
+    with ThreadPoolExecutor(len(endpoints)) as pool:
+        list(pool.map(partial(_puts, snapshot), endpoints))
+    reloaded = Snapshot(tmp_path, endpoints=())
+    for endpoint in endpoints:
+        assert reloaded.get('token', endpoint) == '49'
+    assert list(tmp_path.iterdir()) == [snapshot.path('token')]
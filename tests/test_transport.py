@@ -0,0 +1,121 @@
+#  Copyright 2021-present citharus
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use test_transport.py except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict
+
+import pytest
+from yarl import URL
+
+from azury.asynczury import (
+    FakeAzury,
+    FakeTransport,
+    RecordTransport,
+    ReplayTransport,
+    Transport,
+    TransportError,
+)
+
+BASE: str = 'https://azury.gg/api'
+
+
+async def _request(
+        transport: Transport,
+        method: str,
+        path: str,
+        **params: Any,
+) -> Any:
+    params: Dict[str, Any] = {'token': 'TOKEN', **params}
+    return json.loads(
+        await transport.request(method, URL(f'{BASE}/{path}'), params),
+    )
+
+
+def _run(transport: Transport, method: str, path: str, **params: Any) -> Any:
+    return asyncio.run(_request(transport, method, path, **params))
+
+
+def test_transport_is_abstract():
+    with pytest.raises(TypeError):
+        Transport()
+
+
+def test_fake_routing():
+    server = FakeAzury(files=2, teams=1, team_files=1)
+    transport = FakeTransport(server)
+    file, other = server.files
+    team: str = next(iter(server.teams))
+    team_file: str = next(iter(server.team_files[team]))
+    assert _run(transport, 'GET', 'users/data')['user'] == server.user
+    assert len(_run(transport, 'GET', 'users/files')) == 2
+    assert _run(transport, 'GET', f'users/files/{file}')['_id'] == file
+    assert 'url' in \
+        _run(transport, 'GET', f'teams/{team}/files/{team_file}')
+    assert 'url' in _run(transport, 'PUT', f'users/files/{file}/clone')
+    assert 'Success' in _run(
+        transport, 'DELETE', f'users/files/{other}/delete',
+    )
+    assert 'error' in _run(
+        transport, 'DELETE', f'users/files/{other}/delete',
+    )
+    assert len(server.files) == 2
+    assert 'error' in _run(transport, 'GET', 'users/missing')
+    assert _run(transport, 'GET', 'users/data', token='wrong') == \
+        {'error': 'Unauthorized'}
+
+
+def test_fake_injected_errors():
+    transport = FakeTransport(error_rate=1.0)
+    with pytest.raises(TransportError) as error:
+        _run(transport, 'GET', 'users/data')
+    assert error.value.status == 503
+
+
+async def _record(path, server: FakeAzury) -> None:
+    recorder = RecordTransport(FakeTransport(server), path, buffer=2)
+    files: list[Dict] = await _request(recorder, 'GET', 'users/files')
+    delete: str = f'users/files/{files[0]["_id"]}/delete'
+    for _ in range(2):
+        await _request(recorder, 'DELETE', delete)
+    await recorder.close()
+    failing = RecordTransport(FakeTransport(server, error_rate=1.0), path)
+    with pytest.raises(TransportError):
+        await _request(failing, 'GET', 'users/data')
+    await failing.close()
+
+
+def test_record_replay(tmp_path):
+    path = tmp_path / 'recording.jsonl'
+    server = FakeAzury(files=3)
+    ids: list[str] = list(server.files)
+    asyncio.run(_record(path, server))
+    assert 'TOKEN' not in path.read_text()
+    replay = ReplayTransport(path)
+    files: list[Dict] = _run(replay, 'GET', 'users/files')
+    assert [file['_id'] for file in files] == ids
+    delete: str = f'users/files/{ids[0]}/delete'
+    assert 'Success' in _run(replay, 'DELETE', delete)
+    assert _run(replay, 'DELETE', delete) == {'error': 'File not found'}
+    # The last response is repeated once the recording is exhausted.
+    assert _run(replay, 'DELETE', delete) == {'error': 'File not found'}
+    with pytest.raises(TransportError) as error:
+        _run(replay, 'GET', 'users/data')
+    assert error.value.status == 503
+    assert error.value.message == 'Injected error'
+    with pytest.raises(TransportError) as error:
+        _run(replay, 'GET', 'users/teams')
+    assert error.value.status == 404